@@ -0,0 +1,122 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+
+"""
+bench_headers
+~~~~~~~~~~~~~~~~~
+
+This module benchmarks the request header containers: the former
+``CaseInsensitiveDict`` filled with lowercased keys against
+:class:`Headers <Headers>` built from the raw pairs, for header blocks of
+typical sizes. Each round parses the block, then does the lookups a static
+request costs (``Connection``, ``Cookie``, ``Accept-Encoding``, ``Range``,
+``If-None-Match``, ``If-Modified-Since``); ``--lookups 0`` measures parsing
+alone, as for a request answered without reading its headers.
+
+Usage::
+
+  python bench_headers.py
+  python bench_headers.py --sizes 10 30 --lookups 0
+"""
+
+import argparse
+import timeit
+
+from daemon.dictionary import CaseInsensitiveDict, Headers
+
+#: Fields of a browser request, extended with ``X-Extra-N`` as needed.
+BROWSER_HEADERS = [
+    ("Host", "127.0.0.1:8080"),
+    ("User-Agent", "Mozilla/5.0 (X11; Linux x86_64; rv:131.0) Gecko/20100101 Firefox/131.0"),
+    ("Accept", "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"),
+    ("Accept-Language", "en-US,en;q=0.5"),
+    ("Accept-Encoding", "gzip, deflate, br, zstd"),
+    ("Connection", "keep-alive"),
+    ("Cookie", "session_id=v1.eyJkIjp7InVzZXJuYW1lIjoiYWRtaW4ifX0.c2lnbmF0dXJl; theme=dark"),
+    ("Upgrade-Insecure-Requests", "1"),
+    ("Sec-Fetch-Dest", "document"),
+    ("Sec-Fetch-Mode", "navigate"),
+    ("Sec-Fetch-Site", "same-origin"),
+    ("If-None-Match", '"165dd219e2ea05b6bea3"'),
+    ("If-Modified-Since", "Tue, 11 Nov 2025 05:10:43 GMT"),
+    ("Cache-Control", "max-age=0"),
+    ("Priority", "u=0, i"),
+]
+LOOKUPS = ("Connection", "Cookie", "Accept-Encoding", "Range", "If-None-Match",
+           "If-Modified-Since")
+
+
+def header_block(size):
+    """Returns the lines of a request with ``size`` header fields."""
+    fields = list(BROWSER_HEADERS[:size])
+    fields += [("X-Extra-{}".format(i), "value-{}".format(i))
+               for i in range(size - len(fields))]
+    return ["GET /index.html HTTP/1.1"] + ["{}: {}".format(k, v) for k, v in fields]
+
+
+def parse_dict(lines):
+    """The former ``Request.prepare_headers``."""
+    headers = CaseInsensitiveDict()
+    for line in lines[1:]:
+        key, sep, val = line.partition(':')
+        if sep:
+            headers[key.strip().lower()] = val.strip()
+    return headers
+
+
+def parse_headers(lines):
+    """``Request.prepare_headers``."""
+    pairs = []
+    for line in lines[1:]:
+        key, sep, val = line.partition(':')
+        if sep:
+            pairs.append((key.strip(), val.strip()))
+    return Headers(pairs)
+
+
+def run(parse, lines, lookups):
+    headers = parse(lines)
+    for name in lookups:
+        headers.get(name)
+
+
+def bench(sizes, lookups, repeat, number):
+    print("{:>7} {:>8} {:>22} {:>14} {:>8}".format(
+        "fields", "lookups", "CaseInsensitiveDict", "Headers", "ratio"))
+    for size in sizes:
+        lines = header_block(size)
+        timings = []
+        for parse in (parse_dict, parse_headers):
+            best = min(timeit.repeat(lambda: run(parse, lines, lookups),
+                                     repeat=repeat, number=number))
+            timings.append(best / number * 1e6)
+        print("{:>7} {:>8} {:>19.2f} us {:>11.2f} us {:>7.2f}x".format(
+            size, len(lookups), timings[0], timings[1], timings[0] / timings[1]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog='bench_headers',
+        description='Compare CaseInsensitiveDict and Headers on request header blocks',
+    )
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 20, 30],
+                        help='Header fields per request. Default is 10 20 30.')
+    parser.add_argument('--lookups', type=int, default=len(LOOKUPS),
+                        help='Lookups per request, at most {}. Default is all.'.format(len(LOOKUPS)))
+    parser.add_argument('--number', type=int, default=20000,
+                        help='Requests per timing. Default is 20000.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Timings per case, the best is kept. Default is 5.')
+    args = parser.parse_args()
+
+    bench(args.sizes, LOOKUPS[:args.lookups], args.repeat, args.number)
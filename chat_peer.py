@@ -20,9 +20,11 @@ Each peer runs as a web application with HTML UI.
 import socket
 import threading
 import argparse
+import asyncio
 import json
 import time
 from daemon.weaprous import WeApRous
+from daemon.memory import MEMORY
 
 # Peer configuration
 peer_config = {
@@ -38,7 +40,10 @@ peer_config = {
     'handshakes': {}  # Track handshake status: peer_id -> {'status': 'pending'|'accepted', 'timestamp': time}
 }
 
-app = WeApRous()
+MEMORY.watch("messages", lambda: len(peer_config['messages']))
+MEMORY.watch("connected_peers", lambda: len(peer_config['connected_peers']))
+
+app = WeApRous(sniff_strings=True)
 
 # P2P Socket Server
 p2p_server_socket = None
@@ -229,7 +234,7 @@ def get_messages(headers="guest", body="anonymous"):
         })
 
 @app.route('/api/messages/poll', methods=['GET'])
-def poll_messages(headers="guest", body="anonymous"):
+async def poll_messages(headers="guest", body="anonymous"):
     """Long-polling endpoint for real-time updates."""
     # Wait for new messages (max 30 seconds)
     timeout = 30
@@ -249,7 +254,7 @@ def poll_messages(headers="guest", body="anonymous"):
                 })
         
         # Sleep briefly before checking again
-        time.sleep(0.5)
+        await asyncio.sleep(0.5)
     
     # Timeout - no new messages
     return json.dumps({
@@ -259,15 +264,17 @@ def poll_messages(headers="guest", body="anonymous"):
     })
 
 @app.route('/api/peers/poll', methods=['GET'])
-def poll_peers(headers="guest", body="anonymous"):
+async def poll_peers(headers="guest", body="anonymous"):
     """Long-polling endpoint for peer updates."""
     timeout = 30
     start_time = time.time()
     last_check = peer_update_flag['timestamp']
     
+    loop = asyncio.get_running_loop()
+    
     while (time.time() - start_time) < timeout:
         # Check server for peer updates
-        result = send_http_to_server('GET', '/get-list')
+        result = await loop.run_in_executor(None, send_http_to_server, 'GET', '/get-list')
         if result.get('status') == 'success':
             peer_count = len(result.get('peers', []))
             
@@ -283,7 +290,7 @@ def poll_peers(headers="guest", body="anonymous"):
                         'timestamp': peer_update_flag['timestamp']
                     })
         
-        time.sleep(1)
+        await asyncio.sleep(1)
     
     return json.dumps({
         'status': 'success',
@@ -292,15 +299,17 @@ def poll_peers(headers="guest", body="anonymous"):
     })
 
 @app.route('/api/channels/poll', methods=['GET'])
-def poll_channels(headers="guest", body="anonymous"):
+async def poll_channels(headers="guest", body="anonymous"):
     """Long-polling endpoint for channel updates."""
     timeout = 30
     start_time = time.time()
     last_check = channel_update_flag['timestamp']
     
+    loop = asyncio.get_running_loop()
+    
     while (time.time() - start_time) < timeout:
         # Check server for channel updates
-        result = send_http_to_server('GET', '/channels')
+        result = await loop.run_in_executor(None, send_http_to_server, 'GET', '/channels')
         if result.get('status') == 'success':
             channel_count = len(result.get('channels', []))
             
@@ -316,7 +325,7 @@ def poll_channels(headers="guest", body="anonymous"):
                         'timestamp': channel_update_flag['timestamp']
                     })
         
-        time.sleep(1)
+        await asyncio.sleep(1)
     
     
     return json.dumps({
@@ -621,6 +630,12 @@ if __name__ == "__main__":
     parser.add_argument('--peer-port', type=int, required=True)
     parser.add_argument('--server-ip', default='127.0.0.1')
     parser.add_argument('--server-port', type=int, default=8000)
+    parser.add_argument('--engine', choices=['asyncio', 'thread'], default='asyncio',
+                        help='Backend engine; asyncio keeps long-polls off OS threads')
+    parser.add_argument('--sample-hz', type=int, default=0,
+                        help='Sample thread stacks at this rate in Hz; kill -USR2 dumps them')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Trace allocations with tracemalloc, see GET /debug/memory')
     
     args = parser.parse_args()
     
@@ -656,4 +671,4 @@ if __name__ == "__main__":
         args.username, args.peer_port))
     print("[Peer] P2P Port: {}".format(args.peer_port + 1000))
     print("=" * 60)
-    app.run()
\ No newline at end of file
+    app.run(engine=args.engine, sampling=args.sample_hz, memory=args.trace_memory)
\ No newline at end of file
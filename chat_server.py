@@ -19,6 +19,8 @@ Uses form data format for all communication.
 """
 
 from daemon.weaprous import WeApRous
+from daemon.reply import RawJSON
+from daemon.memory import MEMORY
 import json
 import threading
 import time
@@ -27,21 +29,26 @@ import time
 active_peers = {}  # Structure: {"peer_id": {"ip": str, "port": int, "username": str}}
 channels = {"general": {"peers": [], "owner": "system"}}  # Channel management
 
+MEMORY.watch("active_peers", lambda: len(active_peers))
+MEMORY.watch("channels", lambda: len(channels))
+
 # Thread-safe locks
 peers_lock = threading.Lock()
 channels_lock = threading.Lock()
 
 
 
-app = WeApRous()
+app = WeApRous(sniff_strings=True)
 
 # Submit-info
 @app.route('/submit-info', methods=['POST'])
-def submit_info(headers="", body=""):
+def submit_info(headers="", body="", request=None):
     """Peer registration."""
     try:
-        data = json.loads(body)
+        data = request.json()
         peer_id = data.get('peer_id')
+        if not peer_id or not data.get('port'):
+            return json.dumps({'status': 'error', 'message': 'Missing fields'})
         peer_info = {
             'ip': data.get('ip'),
             'port': int(data.get('port')),
@@ -66,7 +73,7 @@ def get_list(headers="", body=""):
             {'id': pid, 'ip': info['ip'], 'port': info['port'], 'username': info['username']}
             for pid, info in active_peers.items()
         ]
-    return json.dumps({'status': 'success', 'peers': peers})
+    return RawJSON.dumps({'status': 'success', 'peers': peers})
 
 # List channels
 @app.route('/channels', methods=['GET'])
@@ -77,14 +84,14 @@ def list_channels(headers="", body=""):
             {'name': name, 'owner': data['owner'], 'members': len(data['peers'])}
             for name, data in channels.items()
         ]
-    return json.dumps({'status': 'success', 'channels': channel_list})
+    return RawJSON.dumps({'status': 'success', 'channels': channel_list})
 
 # Connect peer
 @app.route('/connect-peer', methods=['POST'])
-def connect_peer(headers="", body=""):
+def connect_peer(headers="", body="", request=None):
     """Get peer connection info."""
     try:
-        data = json.loads(body)
+        data = request.json()
         peer_id = data.get('peer_id')
 
         with peers_lock:
@@ -103,12 +110,14 @@ def connect_peer(headers="", body=""):
 
 # Create new channel
 @app.route('/channel/create', methods=['POST'])
-def create_channel(headers="", body=""):
+def create_channel(headers="", body="", request=None):
     """Create channel."""
     try:
-        data = json.loads(body)
+        data = request.json()
         channel = data.get('channel')
         peer_id = data.get('peer_id')
+        if not channel or not peer_id:
+            return json.dumps({'status': 'error', 'message': 'Missing fields'})
 
         with channels_lock:
             if channel in channels:
@@ -121,12 +130,14 @@ def create_channel(headers="", body=""):
 
 # Join channel
 @app.route('/channel/join', methods=['POST'])
-def join_channel(headers="", body=""):
+def join_channel(headers="", body="", request=None):
     """Join channel."""
     try:
-        data = json.loads(body)
+        data = request.json()
         channel = data.get('channel')
         peer_id = data.get('peer_id')
+        if not channel or not peer_id:
+            return json.dumps({'status': 'error', 'message': 'Missing fields'})
 
         with channels_lock:
             if channel not in channels:
@@ -140,10 +151,10 @@ def join_channel(headers="", body=""):
 
 # See channel members
 @app.route('/channel/members', methods=['POST'])
-def channel_members(headers="", body=""):
+def channel_members(headers="", body="", request=None):
     """Get channel members."""
     try:
-        data = json.loads(body)
+        data = request.json()
         channel = data.get('channel')
 
         with channels_lock:
@@ -171,6 +182,12 @@ if __name__ == "__main__":
     )
     parser.add_argument('--server-ip', default='127.0.0.1')
     parser.add_argument('--server-port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes sharing the port via SO_REUSEPORT')
+    parser.add_argument('--sample-hz', type=int, default=0,
+                        help='Sample thread stacks at this rate in Hz; kill -USR2 dumps them')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Trace allocations with tracemalloc, see GET /debug/memory')
 
     args = parser.parse_args()
 
@@ -178,5 +195,7 @@ if __name__ == "__main__":
     print("=" * 50)
     print("Chat Tracker Server")
     print("Link: http://{}:{}".format(args.server_ip, args.server_port))
+    if args.workers > 1:
+        print("Warning: peers and channels are tracked per worker process")
     print("=" * 50)
-    app.run()
\ No newline at end of file
+    app.run(processes=args.workers, sampling=args.sample_hz, memory=args.trace_memory)
\ No newline at end of file
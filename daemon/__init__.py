@@ -14,7 +14,10 @@ from .backend import create_backend
 from .proxy import create_proxy
 from .weaprous import WeApRous
 from .response import Response
+from .reply import Reply, RawJSON
 from .request import Request
 from .backend import create_backend
 from .httpadapter import HttpAdapter
-from .dictionary import CaseInsensitiveDict
\ No newline at end of file
+from .dictionary import CaseInsensitiveDict, Headers
+from .workerpool import WorkerPool
+from .router import Router
@@ -0,0 +1,238 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.asyncbackend
+~~~~~~~~~~~~~~~~~
+
+This module provides the asyncio engine of the backend daemon. All client
+connections are served by a single event loop created with
+``asyncio.start_server``, so an idle or long-polling client costs a coroutine
+instead of an OS thread.
+
+Request parsing and route dispatch are shared with the threaded backend
+through :class:`HttpAdapter <HttpAdapter>`:
+
+- ``async def`` route handlers are awaited directly on the event loop.
+- Plain route handlers, and the static/login handling of the adapter, run in
+  a thread pool executor so they never block the loop.
+
+Usage Example:
+--------------
+>>> create_backend("127.0.0.1", 9000, routes={}, engine="asyncio")
+
+"""
+
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+from .httpadapter import HttpAdapter, hook_arguments, hook_sniffs, KEEPALIVE_TIMEOUT
+from .reader import RequestError, content_length, MAX_HEADER_SIZE
+from .static import FileSegment, is_file_response
+from .workerpool import DEFAULT_POOL_SIZE
+from .utils import create_listen_socket
+from .logger import get_logger
+from .metrics import METRICS
+from .profiling import PROFILER
+
+log = get_logger("AsyncBackend")
+
+#: Largest read of a request body, each one under the idle timeout.
+BODY_CHUNK_SIZE = 65536
+
+
+async def read_request(reader, timeout=None):
+    """
+    Reads one HTTP message (header block and Content-Length body) from a stream.
+
+    :param reader (asyncio.StreamReader): client stream.
+    :param timeout (float): idle seconds allowed for the header, and for each
+                            chunk of the body, like the per-``recv`` timeout
+                            of the threaded engine; a slow upload that keeps
+                            sending is not cut.
+
+    :rtype tuple: ``(head, body)`` bytes, ``head`` without the blank line, or
+                  ``None`` if the client closed the connection before sending
+                  a full header.
+    :raises RequestError: header or body over the reader limits, or an
+                          invalid Content-Length.
+    :raises asyncio.TimeoutError: the client stayed idle for ``timeout``.
+    """
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise RequestError(431, "Request Header Fields Too Large",
+                           "Request header exceeds {} bytes".format(MAX_HEADER_SIZE))
+
+    remaining = content_length(head)
+    chunks = []
+    while remaining > 0:
+        chunk = await asyncio.wait_for(reader.read(min(remaining, BODY_CHUNK_SIZE)), timeout)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return head[:-4], b"".join(chunks)
+
+
+async def write_response(writer, response):
+    """
+    Writes a response built by the adapter. The ``bytes`` parts of a
+    ``(header, part, ...)`` response are handed to the transport together
+    with ``writelines`` (a single ``sendmsg`` where the loop supports it);
+    ``FileSegment`` parts go through ``loop.sendfile`` so the file is not
+    read into memory.
+
+    :param writer (asyncio.StreamWriter): client write stream.
+    :param response (bytes | tuple): bytes, or ``(header, part, ...)``.
+    """
+    if not is_file_response(response):
+        writer.write(response)
+        await writer.drain()
+        return
+    loop = asyncio.get_running_loop()
+    buffers = []
+    for part in response:
+        if not isinstance(part, FileSegment):
+            buffers.append(part)
+            continue
+        if buffers:
+            writer.writelines(buffers)
+            buffers = []
+        await writer.drain()
+        with open(part.path, "rb") as f:
+            sent = await loop.sendfile(writer.transport, f, part.offset, part.count)
+        if sent < part.count:
+            raise OSError("{} shrank while being sent".format(part.path))
+    if buffers:
+        writer.writelines(buffers)
+    await writer.drain()
+
+
+async def handle_client(reader, writer, ip, port, routes, executor):
+    """
+    Serves the requests of one client connection on the event loop, keeping
+    it open between requests as negotiated by the adapter.
+
+    :param reader (asyncio.StreamReader): client read stream.
+    :param writer (asyncio.StreamWriter): client write stream.
+    :param ip (str): IP address of the server.
+    :param port (int): Port number the server is listening on.
+    :param routes (dict): Dictionary of route handlers.
+    :param executor (Executor): runs blocking handlers off the loop.
+    """
+    loop = asyncio.get_running_loop()
+    addr = writer.get_extra_info("peername")
+    daemon = HttpAdapter(ip, port, None, addr, routes)
+    METRICS.connection_opened()
+
+    try:
+        while True:
+            try:
+                parts = await read_request(reader, KEEPALIVE_TIMEOUT)
+                if parts is None:
+                    return
+                head, body = parts
+                req = daemon.prepare_request(head, routes, body)
+            except asyncio.TimeoutError:
+                return
+            except RequestError as e:
+                log.warning("Request rejected from %s: %s", addr, e)
+                daemon.keep_alive = False
+                writer.write(daemon.build_error(e.code, e.reason, str(e)))
+                await writer.drain()
+                return
+            except Exception as e:
+                log.warning("Request read error from %s: %s", addr, e)
+                daemon.keep_alive = False
+                writer.write(daemon.build_error(400, "Bad Request", str(e)))
+                await writer.drain()
+                return
+
+            if req.hook and inspect.iscoroutinefunction(req.hook):
+                log.debug("Awaiting hook %s", req.hook._route_path)
+                try:
+                    hook_result = await PROFILER.call_async(
+                        daemon.route, req.method, req.hook, **hook_arguments(req))
+                    response = daemon.build_hook_response(hook_result, hook_sniffs(req.hook))
+                except Exception as e:
+                    log.error("Hook execution error: %s", e)
+                    response = daemon.build_error(500, "Internal Server Error", str(e))
+            else:
+                try:
+                    response = await loop.run_in_executor(
+                        executor, daemon.run_hook if req.hook else daemon.dispatch, req)
+                except Exception as e:
+                    log.error("Dispatch error for %s %s: %s", req.method, req.path, e)
+                    daemon.keep_alive = False
+                    response = daemon.build_error(500, "Internal Server Error", str(e))
+
+            daemon.record_response(req, response)
+            await write_response(writer, response)
+            if not daemon.keep_alive:
+                return
+    except (ConnectionError, OSError) as e:
+        log.warning("Connection error %s: %s", addr, e)
+    finally:
+        METRICS.connection_closed()
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+async def serve(ip, port, routes, pool_size=DEFAULT_POOL_SIZE, reuse_port=False):
+    """
+    Starts the asyncio server and serves forever.
+
+    :param ip (str): IP address to bind the server.
+    :param port (int): Port number to listen on.
+    :param routes (dict): Dictionary of route handlers.
+    :param pool_size (int): Number of executor threads for blocking handlers.
+    :param reuse_port (bool): bind with ``SO_REUSEPORT`` (prefork workers).
+    """
+    executor = ThreadPoolExecutor(max_workers=pool_size,
+                                  thread_name_prefix="backend-executor")
+
+    async def on_client(reader, writer):
+        await handle_client(reader, writer, ip, port, routes, executor)
+
+    sock = create_listen_socket(ip, port, reuse_port=reuse_port)
+    server = await asyncio.start_server(on_client, sock=sock, limit=MAX_HEADER_SIZE)
+    log.info("Listening on port %s", port)
+    if routes != {}:
+        log.info("route settings %s", routes)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        executor.shutdown(wait=False)
+
+
+def run_async_backend(ip, port, routes, pool_size=DEFAULT_POOL_SIZE, reuse_port=False):
+    """
+    Runs the asyncio engine until interrupted.
+
+    :param ip (str): IP address to bind the server.
+    :param port (int): Port number to listen on.
+    :param routes (dict): Dictionary of route handlers.
+    :param pool_size (int): Number of executor threads for blocking handlers.
+    :param reuse_port (bool): bind with ``SO_REUSEPORT`` (prefork workers).
+    """
+    try:
+        asyncio.run(serve(ip, port, routes, pool_size, reuse_port))
+    except OSError as e:
+        log.error("Socket error: %s", e)
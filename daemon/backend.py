@@ -16,13 +16,14 @@ daemon.backend
 
 This module provides a backend object to manage and persist backend daemon. 
 It implements a basic backend server using Python's socket and threading libraries.
-It supports handling multiple client connections concurrently and routing requests using a
-custom HTTP adapter.
+It supports handling multiple client connections concurrently on a bounded worker pool
+and routing requests using a custom HTTP adapter.
 
 Requirements:
 --------------
 - socket: provide socket networking interface.
 - threading: Enables concurrent client handling via threads.
+- workerpool: fixed-size worker pool with a bounded accept queue.
 - response: response utilities.
 - httpadapter: the class for handling HTTP requests.
 - CaseInsensitiveDict: provides dictionary for managing headers or routes.
@@ -30,24 +31,47 @@ Requirements:
 
 Notes:
 ------
-- The server create daemon threads for client handling.
+- Clients are served by a fixed number of daemon worker threads; a burst of
+  connections waits in a bounded queue instead of spawning new threads.
 - The current implementation error handling is minimal, socket errors are printed to the console.
 - The actual request processing is delegated to the HttpAdapter class.
 
 Usage Example:
 --------------
 >>> create_backend("127.0.0.1", 9000, routes={})
+>>> create_backend("127.0.0.1", 9000, routes={}, pool_size=16, queue_size=64, overflow="reject")
+>>> create_backend("127.0.0.1", 9000, routes={}, engine="asyncio")
+>>> create_backend("127.0.0.1", 9000, routes={}, engine="reactor")
+>>> create_backend("0.0.0.0", 9000, routes={}, processes=4)
 
 """
 
+import os
 import socket
 import threading
 import argparse
+import time
 
 from .response import *
-from .httpadapter import HttpAdapter
+from .httpadapter import HttpAdapter, render_template
+from .workerpool import WorkerPool, DEFAULT_POOL_SIZE, DEFAULT_QUEUE_SIZE
+from .asyncbackend import run_async_backend
+from .reactor import run_reactor_backend, DEFAULT_REACTOR_WORKERS
+from .prefork import run_prefork
+from .router import Router
+from .logger import get_logger, configure
+from .metrics import METRICS, DEFAULT_ENDPOINT
+from .profiling import PROFILER, SAMPLER
+from .memory import MEMORY
+from .session import SESSION_KEY_ENV, use_signed_sessions
+from .utils import create_listen_socket
 from .dictionary import CaseInsensitiveDict
 
+#: Connection engines accepted by :func:`create_backend`.
+ENGINES = ("thread", "asyncio", "reactor")
+
+log = get_logger("Backend")
+
 def handle_client(ip, port, conn, addr, routes):
     """
     Initializes an HttpAdapter instance and delegates the client handling logic to it.
@@ -62,46 +86,158 @@ def handle_client(ip, port, conn, addr, routes):
     # Handle client
     daemon.handle_client(conn, addr, routes)
 
-def run_backend(ip, port, routes):
+def reject_client(conn, addr):
+    """
+    Answers ``503 Service Unavailable`` on a connection the worker pool
+    refused, then closes it.
+
+    :param conn (socket.socket): Client connection socket.
+    :param addr (tuple): client address (IP, port).
+    """
+    try:
+        # Drain the request bytes already received so closing the socket
+        # does not turn into a connection reset on the client side.
+        conn.setblocking(False)
+        try:
+            conn.recv(65536)
+        except (BlockingIOError, socket.error):
+            pass
+        conn.settimeout(1.0)
+        conn.sendall(render_template("service_unavailable"))
+    except socket.error:
+        pass
+    finally:
+        conn.close()
+
+def run_backend(ip, port, routes, pool_size=DEFAULT_POOL_SIZE,
+                queue_size=DEFAULT_QUEUE_SIZE, overflow="block", reuse_port=False):
     """
     Starts the backend server, binds to the specified IP and port, and listens for incoming
-    connections. Each connection is handled in a separate thread. The backend accepts incoming
-    connections and spawns a thread for each client.
+    connections. Accepted connections are queued to a fixed-size :class:`WorkerPool
+    <WorkerPool>`; when its queue is full the ``overflow`` policy either blocks the
+    accept loop or answers 503 right away.
 
 
     :param ip (str): IP address to bind the server.
     :param port (int): Port number to listen on.
     :param routes (dict): Dictionary of route handlers.
+    :param pool_size (int): Number of worker threads serving connections.
+    :param queue_size (int): Number of accepted connections allowed to wait for a worker.
+    :param overflow (str): ``"block"`` or ``"reject"`` when the queue is full.
+    :param reuse_port (bool): bind with ``SO_REUSEPORT`` (prefork workers).
     """
-    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    pool = WorkerPool(pool_size, queue_size, overflow, name="backend")
 
     try:
-        server.bind((ip, port))
-        server.listen(50)
-        print("[Backend] Listening on port {}".format(port))
+        server = create_listen_socket(ip, port, reuse_port=reuse_port)
+        pool.start()
+        log.info("Listening on port %s", port)
+        log.info("Worker pool %s", pool.report())
         if routes != {}:
-            print("[Backend] route settings {}".format(routes))
+            log.info("route settings %s", routes)
 
+        last_report = 0.0
         while True:
             conn, addr = server.accept()
-            #
-            #  TODO: implement the step of the client incomping connection
-            #        using multi-thread programming with the
-            #        provided handle_client routine
-            #
-            thread = threading.Thread(target=handle_client, args=(ip, port, conn, addr, routes))
-            thread.daemon = True
-            thread.start()
+            if pool.full():
+                # Report saturation at most once per second
+                now = time.monotonic()
+                if now - last_report >= 1.0:
+                    last_report = now
+                    log.warning("Worker pool saturated %s", pool.report())
+            if not pool.submit(handle_client, ip, port, conn, addr, routes):
+                reject_client(conn, addr)
     except socket.error as e:
-      print("Socket error: {}".format(e))
+      log.error("Socket error: %s", e)
 
-def create_backend(ip, port, routes={}):
+def run_engine(ip, port, routes, pool_size=DEFAULT_POOL_SIZE, queue_size=DEFAULT_QUEUE_SIZE,
+               overflow="block", engine="thread", reuse_port=False):
+    """
+    Runs the accept loop of the selected engine in the current process.
+
+    :param engine (str): ``"thread"``, ``"asyncio"`` or ``"reactor"``.
+    :param reuse_port (bool): bind with ``SO_REUSEPORT`` (prefork workers).
+
+    See :func:`create_backend` for the other parameters.
+    """
+    if engine == "asyncio":
+        run_async_backend(ip, port, routes, pool_size, reuse_port)
+    elif engine == "reactor":
+        if pool_size == DEFAULT_POOL_SIZE:
+            pool_size = DEFAULT_REACTOR_WORKERS
+        run_reactor_backend(ip, port, routes, pool_size, queue_size, reuse_port)
+    else:
+        run_backend(ip, port, routes, pool_size, queue_size, overflow, reuse_port)
+
+def create_backend(ip, port, routes={}, pool_size=DEFAULT_POOL_SIZE,
+                   queue_size=DEFAULT_QUEUE_SIZE, overflow="block", engine="thread",
+                   processes=1, log_level=None, metrics=False, profiling=False,
+                   sampling=False, memory=False, session_key=None):
     """
     Entry point for creating and running the backend server.
 
+    The ``engine`` selects how connections are served:
+
+    - ``"thread"``: blocking sockets served by the worker pool (default).
+    - ``"asyncio"``: a single event loop, see :mod:`daemon.asyncbackend`.
+      ``pool_size`` then sizes the executor used for sync route handlers.
+    - ``"reactor"``: a single ``selectors`` loop, see :mod:`daemon.reactor`.
+      Only route hooks are run on a small worker pool; when ``pool_size`` is
+      left at its default the pool gets ``DEFAULT_REACTOR_WORKERS`` threads.
+
+    With ``processes`` > 1 a prefork supervisor (:mod:`daemon.prefork`) runs
+    that many copies of the engine, each binding the port with ``SO_REUSEPORT``.
+
     :param ip (str): IP address to bind the server.
     :param port (int): Port number to listen on.
-    :param routes (dict, optional): Dictionary of route handlers. Defaults to empty dict.
+    :param routes (dict, optional): Dictionary of route handlers, compiled into a
+                                    :class:`Router <Router>`. Defaults to empty dict.
+    :param pool_size (int, optional): Number of worker threads serving connections.
+    :param queue_size (int, optional): Capacity of the accept queue in front of the workers.
+    :param overflow (str, optional): ``"block"`` to stall accepting while the queue is full,
+                                     ``"reject"`` to answer 503 immediately.
+    :param engine (str, optional): ``"thread"``, ``"asyncio"`` or ``"reactor"``.
+    :param processes (int, optional): Number of worker processes. Defaults to 1.
+    :param log_level (str, optional): ``"debug"``, ``"info"``, ``"warning"`` or
+                                      ``"error"``; see :mod:`daemon.logger`.
+    :param metrics (bool | str, optional): serve :mod:`daemon.metrics` on ``/metrics``
+                                           (``True``) or on the given path.
+    :param profiling (bool | str, optional): serve the :mod:`daemon.profiling`
+                                             control endpoint on ``/debug/profiles``;
+                                             a string is the ``.pstats`` directory.
+    :param sampling (bool | int, optional): run the stack sampler of :mod:`daemon.profiling`
+                                            (``True`` or a rate in Hz) from the start
+                                            and serve it on ``/debug/stacks``. Without
+                                            it, ``SIGUSR2`` still starts the sampler,
+                                            and dumps it once running.
+    :param memory (bool | int, optional): start ``tracemalloc`` (``True`` or a number of
+                                          frames per traceback) and serve :mod:`daemon.memory`
+                                          on ``/debug/memory``.
+    :param session_key (str | bytes | list, optional): sign stateless session cookies
+                                                       with this key (see :mod:`daemon.session`);
+                                                       defaults to ``$WEAPROUS_SESSION_KEY``.
     """
 
-    run_backend(ip, port, routes)
\ No newline at end of file
+    if engine not in ENGINES:
+        raise ValueError("Unknown backend engine {}".format(engine))
+    if not isinstance(routes, Router):
+        routes = Router(routes)
+    if log_level is not None:
+        configure(level=log_level)
+    if metrics:
+        METRICS.endpoint = metrics if isinstance(metrics, str) else DEFAULT_ENDPOINT
+    if profiling:
+        PROFILER.enable(profiling if isinstance(profiling, str) else None)
+    if sampling:
+        SAMPLER.enable(None if sampling is True else sampling, PROFILER.directory)
+    SAMPLER.install_signal()
+    if memory:
+        MEMORY.enable(None if memory is True else memory)
+    if session_key or os.environ.get(SESSION_KEY_ENV):
+        use_signed_sessions(session_key or None)
+
+    args = (ip, port, routes, pool_size, queue_size, overflow, engine)
+    if processes > 1:
+        run_prefork(run_engine, processes, args, {"reuse_port": True})
+    else:
+        run_engine(*args)
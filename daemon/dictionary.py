@@ -10,7 +10,7 @@
 # while attending the course
 #
 
-from collections.abc import MutableMapping
+from collections.abc import Mapping, MutableMapping
 
 class CaseInsensitiveDict(MutableMapping):
     """The :class:`CaseInsensitiveDict<MutableMapping>` object, which 
@@ -49,4 +49,102 @@ class CaseInsensitiveDict(MutableMapping):
         return iter(self.store)
 
     def __len__(self):
-        return len(self.store)
\ No newline at end of file
+        return len(self.store)
+
+class Headers(MutableMapping):
+    """The :class:`Headers <Headers>` object holds HTTP header fields as the
+    ``(name, value)`` pairs received, in order and with their casing.
+
+    Lookups are case-insensitive through a ``lowercase name -> value`` index
+    built in one pass on the first lookup, so parsing a header block costs
+    one list append per line and a request nobody inspects never builds it.
+    Repeated fields (``Set-Cookie``, ``Via``, ...) are all kept:
+    ``headers[name]`` returns the last one, :meth:`get_all` every one.
+
+    Usage::
+
+      >>> headers = Headers([("Host", "a"), ("Set-Cookie", "x=1"), ("Set-Cookie", "y=2")])
+      >>> headers["host"]
+      'a'
+      >>> headers.get_all("set-cookie")
+      ['x=1', 'y=2']
+      >>> headers["Content-Length"] = "0"
+      >>> headers.raw_items()
+      [('Host', 'a'), ('Set-Cookie', 'x=1'), ('Set-Cookie', 'y=2'), ('Content-Length', '0')]
+    """
+
+    __slots__ = ("_items", "_index")
+
+    def __init__(self, items=None, **kwargs):
+        if isinstance(items, Mapping):
+            items = items.items()
+        self._items = list(items or ())
+        self._items.extend(kwargs.items())
+        self._index = None
+
+    def _lookup(self):
+        index = self._index
+        if index is None:
+            # Later fields overwrite earlier ones: the last value wins
+            index = self._index = {name.lower(): value for name, value in self._items}
+        return index
+
+    def __getitem__(self, name):
+        return self._lookup()[name.lower()]
+
+    def get(self, name, default=None):
+        return self._lookup().get(name.lower(), default)
+
+    def get_all(self, name):
+        """Returns every value of ``name`` in order, ``[]`` if absent."""
+        key = name.lower()
+        if key not in self._lookup():
+            return []
+        return [value for field, value in self._items if field.lower() == key]
+
+    def __contains__(self, name):
+        return isinstance(name, str) and name.lower() in self._lookup()
+
+    def __setitem__(self, name, value):
+        """Replaces every field ``name`` by a single one."""
+        key = name.lower()
+        if key in self._lookup():
+            self._items = [item for item in self._items if item[0].lower() != key]
+        self._items.append((name, value))
+        self._index[key] = value
+
+    def add(self, name, value):
+        """Appends a field, keeping the existing ones of the same name."""
+        self._items.append((name, value))
+        if self._index is not None:
+            self._index[name.lower()] = value
+
+    def __delitem__(self, name):
+        key = name.lower()
+        if key not in self._lookup():
+            raise KeyError(name)
+        self._items = [item for item in self._items if item[0].lower() != key]
+        del self._index[key]
+
+    def __iter__(self):
+        """Yields each field name once, with the casing of its first
+        occurrence."""
+        seen = set()
+        for name, _ in self._items:
+            key = name.lower()
+            if key not in seen:
+                seen.add(key)
+                yield name
+
+    def __len__(self):
+        return len(self._lookup())
+
+    def raw_items(self):
+        """Returns the ``(name, value)`` pairs as received."""
+        return list(self._items)
+
+    def copy(self):
+        return Headers(self._items)
+
+    def __repr__(self):
+        return "Headers({!r})".format(self._items)
@@ -0,0 +1,114 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.headers
+~~~~~~~~~~~~~~~~~
+
+This module provides the serialization of response headers from cached
+byte fragments, so building a header is a ``b"".join`` instead of f-strings
+and ``encode`` calls per response:
+
+- :data:`STATUS_LINES`: ``HTTP/1.1 <code> <reason>\\r\\n`` for every status
+  known to ``http.HTTPStatus``, encoded once at import;
+- :func:`content_type_line`: encoded ``Content-Type`` lines, memoized by
+  value (responses only use a handful of types);
+- :func:`date_line`: the ``Date`` line, formatted at most once per second
+  whatever the request rate;
+- :func:`build_header`: a complete header from those fragments.
+
+Usage Example:
+--------------
+>>> build_header(200, "application/json", len(body), connection=b"Connection: close\\r\\n")
+b'HTTP/1.1 200 OK\\r\\nContent-Type: application/json\\r\\nContent-Length: 2\\r\\nDate: ...'
+"""
+
+import email.utils
+import http
+import time
+
+from .dictionary import Headers
+
+CRLF = b"\r\n"
+
+#: Encoded status line of each known status code.
+STATUS_LINES = {
+    status.value: "HTTP/1.1 {} {}\r\n".format(status.value, status.phrase).encode("ascii")
+    for status in http.HTTPStatus
+}
+
+_content_types = {}
+# (second, encoded Date line) swapped as one tuple, so readers never lock
+_date = (0, b"")
+
+
+def status_line(code, reason=None):
+    """Returns the encoded status line of ``code``, with a custom ``reason``
+    phrase when it is not the standard one."""
+    line = STATUS_LINES.get(code)
+    if line is None or (reason is not None and line[13:-2] != reason.encode("utf-8")):
+        return "HTTP/1.1 {} {}\r\n".format(code, reason or "").encode("utf-8")
+    return line
+
+
+def content_type_line(content_type):
+    """Returns the encoded ``Content-Type`` line of ``content_type``."""
+    line = _content_types.get(content_type)
+    if line is None:
+        line = "Content-Type: {}\r\n".format(content_type).encode("utf-8")
+        if len(_content_types) < 256:
+            _content_types[content_type] = line
+    return line
+
+
+def date_line():
+    """Returns the ``Date`` line of the current second."""
+    global _date
+    now = int(time.time())
+    second, line = _date
+    if second != now:
+        line = b"Date: " + email.utils.formatdate(now, usegmt=True).encode("ascii") + CRLF
+        _date = (now, line)
+    return line
+
+
+def header_lines(headers):
+    """Encodes a ``name -> value`` mapping as header lines; every field of a
+    :class:`Headers <Headers>` is written, repeated ones included."""
+    if not headers:
+        return b""
+    items = headers.raw_items() if isinstance(headers, Headers) else headers.items()
+    return "".join("{}: {}\r\n".format(key, val) for key, val in items).encode("utf-8")
+
+
+def build_header(code, content_type=None, length=None, extra=b"", connection=b"", reason=None):
+    """
+    Serializes a response header, blank line included.
+
+    :param code (int): status code.
+    :param content_type (str): ``Content-Type`` value, omitted if ``None``.
+    :param length (int): ``Content-Length`` value, omitted if ``None``.
+    :param extra (bytes): further encoded header lines, see :func:`header_lines`.
+    :param connection (bytes): encoded ``Connection`` lines.
+    :param reason (str): non-standard reason phrase.
+
+    :rtype bytes: the header.
+    """
+    return b"".join((
+        status_line(code, reason),
+        content_type_line(content_type) if content_type is not None else b"",
+        b"Content-Length: %d\r\n" % length if length is not None else b"",
+        extra,
+        date_line(),
+        connection,
+        CRLF,
+    ))
@@ -17,19 +17,149 @@ daemon.httpadapter
 HTTP adapter for WeApRous framework — final fixed version.
 Features:
 - Full-body read for JSON/form requests
-- Proper JSON responses
-- Static file serving for .html/.css/.js/.png/.jpg
-- Compatible with legacy WeApRous routing
+- Login sessions with random IDs and expiry, or stateless HMAC-signed
+  cookies, see :mod:`daemon.session`
+- Proper JSON responses; hooks may return a :class:`Reply <Reply>` with a
+  status and headers, pre-encoded :class:`RawJSON <RawJSON>` or bytes, and
+  ``str`` results are only sniffed for JSON/HTML when the route opts in
+- Static file serving for .html/.css/.js/.png/.jpg from an in-memory LRU
+  cache, large files through sendfile without reading them into memory
+- ETag / Last-Modified validators and 304 Not Modified for static files
+- Range / If-Range requests answered with 206, including multipart ranges
+- gzip/deflate variants of text assets negotiated with Accept-Encoding
+- Access log and :mod:`daemon.metrics` recorded for every request, with an
+  opt-in Prometheus endpoint
+- On-demand ``cProfile`` capture of route hooks and a stack sampling
+  endpoint, see :mod:`daemon.profiling`
+- Opt-in tracemalloc snapshots, top sites and diffs, see :mod:`daemon.memory`
+- Compatible with legacy WeApRous routing, path parameters through
+  :class:`Router <Router>` and 405 for known paths with another method
+- Response building is independent of the socket, so the threaded and
+  asyncio backends share the same request handling; large bodies stay apart
+  from their header and are written with ``sendmsg``
+- HTTP/1.1 persistent connections with pipelining, an idle timeout and a
+  per-connection request limit
+- Headers joined from pre-encoded fragments (:mod:`daemon.headers`) and
+  templates pre-serialized at import, with a ``Date`` line cached per second
 """
 
 from .request import Request
 from .response import Response
 from .response_template import RESPONSE_TEMPLATES
+from .headers import CRLF, build_header, date_line, header_lines
+from .reader import RequestReader, RequestError
+from .logger import get_logger, access_log
+from .metrics import METRICS, route_label
+from .profiling import PROFILER, SAMPLER
+from .memory import MEMORY
+from .session import SESSION_COOKIE, get_sessions
+from .reply import encode_result
+from .static import (ASSET_CACHE, RangeNotSatisfiable, is_not_modified,
+                     join_response, partial_response, range_not_satisfiable, resolve_path,
+                     select_ranges, select_variant, response_length, response_status, send_response)
+import asyncio
+import inspect
 import json
 import os
+import socket
+import time
 
-SESSIONS = {}
-SESSION_COUNTER = 0
+log = get_logger("HttpAdapter")
+
+MEMORY.watch("sessions", lambda: len(get_sessions()))
+
+#: Seconds an idle persistent connection is kept open.
+KEEPALIVE_TIMEOUT = 5.0
+#: Requests served on one connection before it is closed.
+MAX_KEEPALIVE_REQUESTS = 100
+
+
+def parse_content_length(header_bytes):
+    """Return the Content-Length announced in a raw header block, or 0."""
+    content_length = 0
+    for line in header_bytes.decode(errors="ignore").split("\r\n"):
+        if line.lower().startswith("content-length:"):
+            try:
+                content_length = int(line.split(":", 1)[1].strip())
+            except ValueError:
+                content_length = 0
+    return content_length
+
+
+def connection_header(keep_alive):
+    """Return the ``Connection`` header lines announcing whether the socket stays open."""
+    if keep_alive:
+        return (
+            "Connection: keep-alive\r\n"
+            f"Keep-Alive: timeout={int(KEEPALIVE_TIMEOUT)}, max={MAX_KEEPALIVE_REQUESTS}\r\n"
+        )
+    return "Connection: close\r\n"
+
+
+def hook_arguments(req):
+    """Keyword arguments of the hook of ``req``: the headers, the body text
+    and the path parameters, plus the :class:`Request <Request>` itself when
+    the hook declares a ``request`` parameter."""
+    kwargs = dict(req.params, headers=req.headers, body=req.text)
+    hook = req.hook
+    wants = getattr(hook, "_route_request", None)
+    if wants is None:
+        try:
+            wants = "request" in inspect.signature(hook).parameters
+        except (TypeError, ValueError):
+            wants = False
+        try:
+            hook._route_request = wants
+        except AttributeError:
+            pass
+    if wants:
+        kwargs["request"] = req
+    return kwargs
+
+
+def hook_sniffs(hook):
+    """``True`` if the ``str`` results of ``hook`` get the legacy content
+    type guess, see :meth:`WeApRous.route <WeApRous.route>`."""
+    return getattr(hook, "_route_sniff", False)
+
+
+#: Encoded :func:`connection_header` lines, indexed by ``keep_alive``.
+CONNECTION_LINES = {
+    True: connection_header(True).encode("ascii"),
+    False: connection_header(False).encode("ascii"),
+}
+NO_STORE = b"Cache-Control: no-store\r\n"
+
+#: ``name -> (head, {keep_alive: tail})``: each template serialized once,
+#: the ``Date`` line goes between ``head`` and ``tail``.
+_TEMPLATE_RESPONSES = {}
+
+
+def _serialize_template(name):
+    template = RESPONSE_TEMPLATES[name]
+    head = b"".join((
+        "HTTP/1.1 {}\r\n".format(template["status"]).encode("utf-8"),
+        "Content-Type: {}\r\n".format(template["content_type"]).encode("utf-8"),
+        header_lines(template["headers"]),
+        b"Content-Length: %d\r\n" % len(template["body"]),
+    ))
+    tails = {keep_alive: lines + CRLF + template["body"]
+             for keep_alive, lines in CONNECTION_LINES.items()}
+    serialized = _TEMPLATE_RESPONSES[name.lower()] = (head, tails)
+    return serialized
+
+
+def render_template(name, extra_headers=None, keep_alive=False):
+    """Serialize a :data:`RESPONSE_TEMPLATES` entry into a complete HTTP response."""
+    serialized = _TEMPLATE_RESPONSES.get(name.lower()) or _serialize_template(name)
+    head, tails = serialized
+    if extra_headers:
+        head += header_lines(extra_headers)
+    return b"".join((head, date_line(), tails[bool(keep_alive)]))
+
+
+for _name in RESPONSE_TEMPLATES:
+    _serialize_template(_name)
 
 
 class HttpAdapter:
@@ -41,6 +171,7 @@ class HttpAdapter:
         "routes",
         "request",
         "response",
+        "keep_alive",
     ]
 
     def __init__(self, ip, port, conn, connaddr, routes):
@@ -51,214 +182,389 @@ class HttpAdapter:
         self.routes = routes
         self.request = Request()
         self.response = Response()
+        #: Whether the response being built leaves the connection open
+        self.keep_alive = False
+        #: Number of requests served on this connection
+        self.served = 0
+        #: Monotonic time the current request was parsed, for the access log
+        self.started = 0.0
+        #: Metrics label of the current request, see :func:`route_label`
+        self.route = None
+        #: Incremental reader holding bytes of pipelined requests
+        self._reader = None
 
     # =====================================================
     # =============== Utility: read full body ==============
     # =====================================================
     def _recv_full_request(self, conn):
-        """Read full HTTP request using Content-Length."""
-        msg = b""
-        chunk = conn.recv(1024)
-        msg += chunk
-
-        # read header first
-        while b"\r\n\r\n" not in msg and chunk:
-            chunk = conn.recv(1024)
-            msg += chunk
-
-        # parse header for content length
-        header_part = msg.split(b"\r\n\r\n", 1)[0].decode(errors="ignore")
-        content_length = 0
-        for line in header_part.split("\r\n"):
-            if line.lower().startswith("content-length:"):
-                try:
-                    content_length = int(line.split(":", 1)[1].strip())
-                except ValueError:
-                    content_length = 0
-
-        # read remaining body if any
-        body_part = b""
-        if b"\r\n\r\n" in msg:
-            body_part = msg.split(b"\r\n\r\n", 1)[1]
-        remaining = content_length - len(body_part)
+        """Read one HTTP request using Content-Length.
 
-        while remaining > 0:
-            chunk = conn.recv(min(1024, remaining))
-            if not chunk:
-                break
-            msg += chunk
-            remaining -= len(chunk)
+        Bytes are received into the connection's :class:`RequestReader
+        <RequestReader>`; bytes past the end of the request belong to the
+        next pipelined request and stay buffered for the next call.
 
-        return msg.decode(errors="ignore")
+        :rtype tuple: ``(head, body)`` memoryviews, or ``None`` on EOF.
+        :raises RequestError: header or body over the reader limits.
+        """
+        if self._reader is None:
+            self._reader = RequestReader()
+        return self._reader.read_request(conn)
 
     # =====================================================
     # =============== Main client handler =================
     # =====================================================
     def handle_client(self, conn, addr, routes):
-        """Handle an incoming client connection."""
+        """Handle an incoming client connection.
+
+        Requests are served in a loop while the client keeps the connection
+        alive, until it goes idle for ``KEEPALIVE_TIMEOUT`` seconds or
+        ``MAX_KEEPALIVE_REQUESTS`` requests were served.
+        """
         self.conn = conn
         self.connaddr = addr
-        req = self.request
-        resp = self.response
+        conn.settimeout(KEEPALIVE_TIMEOUT)
+        METRICS.connection_opened()
 
         try:
-            raw_msg = self._recv_full_request(conn)
-            req.prepare(raw_msg, routes)
+            while True:
+                try:
+                    parts = self._recv_full_request(conn)
+                except socket.timeout:
+                    break
+                except RequestError as e:
+                    log.warning("Request rejected from %s: %s", addr, e)
+                    self.keep_alive = False
+                    send_response(conn, self.build_error(e.code, e.reason, str(e)))
+                    break
+                if parts is None:
+                    break
+
+                try:
+                    head, body = parts
+                    req = self.prepare_request(head, routes, body)
+                except Exception as e:
+                    log.warning("Request read error from %s: %s", addr, e)
+                    self.keep_alive = False
+                    send_response(conn, self.build_error(400, "Bad Request", str(e)))
+                    break
+
+                try:
+                    response = self.run_hook(req) if req.hook else self.dispatch(req)
+                except Exception as e:
+                    log.error("Dispatch error for %s %s: %s", req.method, req.path, e)
+                    self.keep_alive = False
+                    response = self.build_error(500, "Internal Server Error", str(e))
+
+                self.record_response(req, response)
+                send_response(conn, response)
+                if not self.keep_alive:
+                    break
         except Exception as e:
-            print(f"[HttpAdapter] Request read error: {e}")
-            self._send_error(conn, 400, "Bad Request", str(e))
-            return
+            log.warning("Connection error %s: %s", addr, e)
+        METRICS.connection_closed()
+        conn.close()
 
-        # ------------------ Route Handling ------------------
-        if req.hook:
-            print(f"[HttpAdapter] Hook matched: {req.hook._route_path} {req.hook._route_methods}")
-            try:
-                hook_result = req.hook(headers=req.headers, body=req.body)
-                if hook_result is None:
-                    hook_result = {"status": "error", "message": "Empty response"}
-
-                # Determine content type
-                if isinstance(hook_result, str):
-                    if hook_result.strip().startswith("{") or hook_result.strip().startswith("["):
-                        content_type = "application/json"
-                        body_bytes = hook_result.encode("utf-8")
-                    elif hook_result.strip().startswith("<"):
-                        content_type = "text/html; charset=utf-8"
-                        body_bytes = hook_result.encode("utf-8")
-                    else:
-                        content_type = "text/plain; charset=utf-8"
-                        body_bytes = hook_result.encode("utf-8")
-                else:
-                    content_type = "application/json"
-                    body_bytes = json.dumps(hook_result).encode("utf-8")
-
-                header = (
-                    "HTTP/1.1 200 OK\r\n"
-                    f"Content-Type: {content_type}\r\n"
-                    f"Content-Length: {len(body_bytes)}\r\n"
-                    "Connection: close\r\n\r\n"
-                )
-                conn.sendall(header.encode("utf-8") + body_bytes)
-                conn.close()
-                return
+    def prepare_request(self, raw_msg, routes, body=None):
+        """Parse a raw HTTP message (or its header block and ``body``) into a
+        fresh :attr:`request`, match its route hook and decide whether the
+        connection stays open after it."""
+        self.started = time.monotonic()
+        self.request = Request()
+        self.request.prepare(raw_msg, routes, body)
+        if (METRICS.endpoint is not None and self.request.path == METRICS.endpoint) \
+                or PROFILER.owns(self.request.path) or SAMPLER.owns(self.request.path) \
+                or MEMORY.owns(self.request.path):
+            # Served by dispatch, never by a user route
+            self.request.hook = None
+        self.route = route_label(self.request)
+        METRICS.request_started(self.route, len(raw_msg) + (len(body) + 4 if body is not None else 0))
+        self.served += 1
+        self.keep_alive = self.should_keep_alive(self.request)
+        return self.request
+
+    def record_response(self, req, response):
+        """Record the metrics and queue the access log line of ``req``
+        answered with ``response``."""
+        status = response_status(response)
+        nbytes = response_length(response)
+        duration = time.monotonic() - self.started
+        METRICS.request_finished(self.route, req.method, status, nbytes, duration)
+        access_log(req.method, req.path, status, nbytes, duration, self.connaddr)
+
+    def should_keep_alive(self, req):
+        """HTTP/1.1 connections persist unless the client sends ``Connection:
+        close``; HTTP/1.0 ones only with ``Connection: keep-alive``."""
+        if self.served >= MAX_KEEPALIVE_REQUESTS:
+            return False
+        tokens = (req.header("Connection", "") or "").lower()
+        if req.version == "HTTP/1.1":
+            return "close" not in tokens
+        return "keep-alive" in tokens
 
-            except Exception as e:
-                print(f"[HttpAdapter] Hook execution error: {e}")
-                self._send_error(conn, 500, "Internal Server Error", str(e))
-                return
+    # =====================================================
+    # =============== Route Handling ======================
+    # =====================================================
+    def run_hook(self, req):
+        """Run the matched route hook and build its HTTP response.
+
+        Hooks declared with ``async def`` are driven to completion on a
+        private event loop so they also work on the threaded backend. The
+        call is profiled when :data:`PROFILER` is armed.
+        """
+        log.debug("Hook matched: %s %s", req.hook._route_path, req.hook._route_methods)
+        try:
+            hook_result = PROFILER.call(self.route, req.method, self._call_hook, req)
+            return self.build_hook_response(hook_result, hook_sniffs(req.hook))
+        except Exception as e:
+            log.error("Hook execution error: %s", e)
+            return self.build_error(500, "Internal Server Error", str(e))
+
+    def _call_hook(self, req):
+        hook_result = req.hook(**hook_arguments(req))
+        if inspect.iscoroutine(hook_result):
+            hook_result = asyncio.run(hook_result)
+        return hook_result
+
+    def build_hook_response(self, hook_result, sniff=False):
+        """Serialize the value returned by a route hook into an HTTP response,
+        see :mod:`daemon.reply` for the accepted types.
+
+        :param sniff (bool): guess the content type of ``str`` results.
+        """
+        status, reason, content_type, extra, body = encode_result(hook_result, sniff)
+        return join_response(self.build_header(status, content_type, len(body), extra, reason),
+                             body)
+
+    def build_header(self, code, content_type, length, extra=b"", reason=None):
+        """Serialize a response header ending with the Connection lines of
+        this connection, see :func:`build_header <daemon.headers.build_header>`."""
+        return build_header(code, content_type, length, extra,
+                            CONNECTION_LINES[self.keep_alive], reason)
+
+    # =====================================================
+    # =============== Request dispatch ====================
+    # =====================================================
+    def dispatch(self, req):
+        """Build the response for a request that did not match a route hook:
+        login, session check, static files and the 404 fallback.
+
+        Returns bytes, or a ``(header, part, ...)`` tuple when large files are
+        sent with sendfile."""
+
+        # ------------------ Metrics endpoint ------------------
+        if METRICS.endpoint is not None and req.path == METRICS.endpoint:
+            return self.build_metrics(req)
+
+        # ------------------ Profiling endpoint ----------------
+        if PROFILER.owns(req.path):
+            return self.build_profiles(req)
+        if SAMPLER.owns(req.path):
+            return self.build_stacks(req)
+        if MEMORY.owns(req.path):
+            return self.build_memory(req)
 
         # ------------------ Login Handling ------------------
-        global SESSION_COUNTER
         if req.method == "POST" and req.path == "/login":
-            self._handle_login(conn, req)
-            return
+            return self._handle_login(req)
 
         # ------------------ Session Validation ---------------
-        cookies = req.headers.get("Cookie", "")
-        session_id = None
-        for c in cookies.split(";"):
-            if "session_id=" in c:
-                session_id = c.strip().split("=")[1]
-                break
-
-        auth_status = SESSIONS.get(session_id, False)
-        if req.path in ["/", "/index.html", "/chat.html"] and not auth_status:
-            resp_template = RESPONSE_TEMPLATES["unauthorized"]
-            header = (
-                f"HTTP/1.1 {resp_template['status']}\r\n"
-                f"Content-Type: {resp_template['content_type']}\r\n"
-                f"Content-Length: {len(resp_template['body'])}\r\n"
-                "Connection: close\r\n\r\n"
-            )
-            conn.sendall(header.encode("utf-8") + resp_template["body"])
-            conn.close()
-            return
+        if req.path in ["/", "/index.html", "/chat.html"] and self.session(req) is None:
+            return render_template("unauthorized", keep_alive=self.keep_alive)
 
         # ------------------ Static file handler ---------------
         if req.method == "GET":
             try:
-                print(f"[HttpAdapter] GET request path: {req.path}")
+                log.debug("GET request path: %s", req.path)
 
                 # 1️⃣ Root → index.html
                 if req.path == "/" or req.path == "":
-                    file_path = os.path.join("www", "index.html")
+                    file_path = resolve_path("www", "index.html")
 
                 # 2️⃣ /login → www/login.html
                 elif req.path == "/login":
-                    file_path = os.path.join("www", "login.html")
+                    file_path = resolve_path("www", "login.html")
 
                 # 3️⃣ /static/... → static/...
                 elif req.path.startswith("/static/"):
-                    rel_path = req.path.lstrip("/")
-                    file_path = os.path.normpath(rel_path)
+                    file_path = resolve_path("static", req.path[len("/static/"):])
 
                 # 4️⃣ /css/... , /images/... , /js/... → static/... (để hỗ trợ HTML cũ)
                 elif req.path.startswith(("/css/", "/images/", "/js/")):
-                    rel_path = os.path.join("static", req.path.lstrip("/"))
-                    file_path = os.path.normpath(rel_path)
+                    file_path = resolve_path("static", req.path)
 
                 # 5️⃣ Các file HTML khác trong www/
                 else:
-                    rel_path = req.path.lstrip("/")
-                    file_path = os.path.join("www", rel_path)
-
-                print(f"[HttpAdapter] Resolved file path: {file_path}")
-
-                # Kiểm tra tồn tại
-                if not os.path.exists(file_path):
-                    print(f"[HttpAdapter] File not found: {file_path}")
-                    self._send_error(conn, 404, "Not Found", f"File {req.path} not found")
-                    return
-
-                # Đọc file
-                with open(file_path, "rb") as f:
-                    body = f.read()
-
-                # MIME type detection
-                if file_path.endswith(".html"):
-                    ctype = "text/html; charset=utf-8"
-                elif file_path.endswith(".css"):
-                    ctype = "text/css"
-                elif file_path.endswith(".js"):
-                    ctype = "application/javascript"
-                elif file_path.endswith((".png", ".jpg", ".jpeg", ".gif")):
-                    ctype = "image/png" if file_path.endswith(".png") else "image/jpeg"
-                else:
-                    ctype = "application/octet-stream"
-
-                # Gửi phản hồi
-                header = (
-                    "HTTP/1.1 200 OK\r\n"
-                    f"Content-Type: {ctype}\r\n"
-                    f"Content-Length: {len(body)}\r\n"
-                    "Connection: close\r\n\r\n"
-                )
-                conn.sendall(header.encode("utf-8") + body)
-                conn.close()
-                return
+                    file_path = resolve_path("www", req.path)
+
+                log.debug("Resolved file path: %s", file_path)
+
+                # Kiểm tra tồn tại (qua cache, revalidate bằng os.stat); đường
+                # dẫn ra ngoài www/ hoặc static/ → 404
+                asset = ASSET_CACHE.get(file_path) if file_path else None
+                if asset is None:
+                    log.debug("File not found: %s", file_path)
+                    return self.build_not_found(req, f"File {req.path} not found")
+
+                tail = date_line() + CONNECTION_LINES[self.keep_alive] + CRLF
+
+                # Chọn bản nén theo Accept-Encoding (gzip/deflate) nếu có
+                rep = select_variant(asset, req.headers)
+
+                # Client đã có bản mới nhất → 304 không body
+                if is_not_modified(rep, req.headers):
+                    return rep.not_modified_header + tail
+
+                # Range → 206 (một hoặc nhiều đoạn), ngoài file → 416
+                try:
+                    ranges = select_ranges(asset, req.headers)
+                except RangeNotSatisfiable:
+                    return range_not_satisfiable(asset, tail)
+                if ranges is not None:
+                    return partial_response(asset, ranges, tail)
+
+                # Gửi phản hồi: file lớn được gửi bằng sendfile, body lớn bằng sendmsg
+                return join_response(rep.header + tail, rep.body)
 
             except Exception as e:
-                print(f"[HttpAdapter] Static file handler error: {e}")
-                self._send_error(conn, 500, "Internal Server Error", str(e))
-                return
+                log.error("Static file handler error: %s", e)
+                return self.build_error(500, "Internal Server Error", str(e))
+
+        # ------------------ Fallback (404 / 405) -------------
+        return self.build_not_found(req, f"No route for {req.method} {req.path}")
+
+    def build_metrics(self, req):
+        """Build the Prometheus text exposition of :data:`METRICS`."""
+        if req.method != "GET":
+            return self.build_error(405, "Method Not Allowed",
+                                    f"{req.method} not allowed for {req.path}",
+                                    {"Allow": "GET"})
+        body = METRICS.render().encode("utf-8")
+        return join_response(self.build_header(200, "text/plain; version=0.0.4; charset=utf-8",
+                                               len(body), NO_STORE), body)
+
+    def build_profiles(self, req):
+        """Serve the :data:`PROFILER` control endpoint: the JSON index on
+        ``GET``, arming with ``POST ?next=N`` / ``?rate=R`` / ``?off``, and
+        ``GET <endpoint>/<file>`` to download one ``.pstats`` file."""
+        name = req.path[len(PROFILER.endpoint):].strip("/")
+        if name:
+            path = PROFILER.profile_path(name) if req.method == "GET" else None
+            if path is None or not os.path.isfile(path):
+                return self.build_not_found(req, f"No profile {name}")
+            with open(path, "rb") as f:
+                body = f.read()
+            disposition = f"Content-Disposition: attachment; filename=\"{name}\"\r\n"
+            return join_response(self.build_header(200, "application/octet-stream", len(body),
+                                                   disposition.encode("utf-8")), body)
+
+        if req.method == "POST":
+            query = req.query
+            try:
+                if "off" in query:
+                    PROFILER.disarm()
+                if "next" in query:
+                    PROFILER.arm(int(query["next"][0]))
+                if "rate" in query:
+                    PROFILER.sample(float(query["rate"][0]))
+            except ValueError as e:
+                return self.build_error(400, "Bad Request", str(e))
+        elif req.method != "GET":
+            return self.build_error(405, "Method Not Allowed",
+                                    f"{req.method} not allowed for {req.path}",
+                                    {"Allow": "GET, POST"})
+
+        body = json.dumps(PROFILER.index()).encode("utf-8")
+        return join_response(self.build_header(200, "application/json", len(body), NO_STORE), body)
+
+    def build_stacks(self, req):
+        """Serve the :data:`SAMPLER` endpoint: the folded stacks on ``GET``,
+        ``POST ?start[&hz=N]`` / ``?stop`` / ``?reset`` to control it."""
+        if req.method == "GET":
+            body = SAMPLER.folded().encode("utf-8")
+            extra = NO_STORE + b"X-Samples: %d\r\n" % SAMPLER.samples
+            return join_response(self.build_header(200, "text/plain; charset=utf-8", len(body), extra),
+                                 body)
+        if req.method != "POST":
+            return self.build_error(405, "Method Not Allowed",
+                                    f"{req.method} not allowed for {req.path}",
+                                    {"Allow": "GET, POST"})
+
+        query = req.query
+        try:
+            if "stop" in query:
+                SAMPLER.stop()
+            if "reset" in query:
+                SAMPLER.reset()
+            if "start" in query or "hz" in query:
+                SAMPLER.start(int(query["hz"][0]) if "hz" in query else None)
+        except ValueError as e:
+            return self.build_error(400, "Bad Request", str(e))
+        body = json.dumps(SAMPLER.status()).encode("utf-8")
+        return join_response(self.build_header(200, "application/json", len(body), NO_STORE), body)
+
+    def build_memory(self, req):
+        """Serve the :data:`MEMORY` endpoint: index, tracing control,
+        ``/snapshot``, ``/top`` and ``/diff`` (see :mod:`daemon.memory`)."""
+        action = req.path[len(MEMORY.endpoint):].strip("/")
+        query = {key: values[0] for key, values in req.query.items()}
+        allowed = {"": ("GET", "POST"), "snapshot": ("POST",), "top": ("GET",),
+                   "diff": ("GET",)}
+        if action not in allowed:
+            return self.build_not_found(req, f"No memory action {action}")
+        if req.method not in allowed[action]:
+            return self.build_error(405, "Method Not Allowed",
+                                    f"{req.method} not allowed for {req.path}",
+                                    {"Allow": ", ".join(allowed[action])})
 
-        # ------------------ Fallback (404) -------------------
-        self._send_error(conn, 404, "Not Found", f"No route for {req.method} {req.path}")
+        try:
+            limit = int(query.get("limit", 20))
+            by = query.get("by", "lineno")
+            if action == "snapshot":
+                result = MEMORY.snapshot()
+            elif action == "top":
+                snapshot_id = int(query["id"]) if "id" in query else None
+                result = MEMORY.top(limit, by, snapshot_id)
+            elif action == "diff":
+                to_id = int(query["to"]) if "to" in query else None
+                result = MEMORY.diff(int(query["from"]), to_id, limit, by)
+            else:
+                if req.method == "POST":
+                    if "stop" in query:
+                        MEMORY.stop()
+                    if "start" in query:
+                        MEMORY.start(int(query["frames"]) if "frames" in query else None)
+                result = MEMORY.index()
+        except (KeyError, ValueError) as e:
+            return self.build_error(400, "Bad Request", str(e).strip("'\""))
+        except RuntimeError as e:
+            return self.build_error(409, "Conflict", str(e))
+
+        body = json.dumps(result).encode("utf-8")
+        return join_response(self.build_header(200, "application/json", len(body), NO_STORE), body)
 
     # =====================================================
     # =============== Helper: send JSON error ==============
     # =====================================================
+    def build_error(self, code, reason, message, headers=None):
+        """Build standardized JSON error."""
+        body = json.dumps({"status": "error", "code": code, "message": message}).encode("utf-8")
+        return self.build_header(code, "application/json", len(body),
+                                 header_lines(headers), reason) + body
+
+    def build_not_found(self, req, message):
+        """Build the 404 error, or 405 with ``Allow`` when a route exists for
+        the path under other methods."""
+        if req.allowed:
+            return self.build_error(
+                405, "Method Not Allowed",
+                f"{req.method} not allowed for {req.path}",
+                {"Allow": ", ".join(req.allowed)})
+        return self.build_error(404, "Not Found", message)
+
     def _send_error(self, conn, code, reason, message):
         """Send standardized JSON error."""
-        body = json.dumps({"status": "error", "code": code, "message": message})
-        header = (
-            f"HTTP/1.1 {code} {reason}\r\n"
-            "Content-Type: application/json\r\n"
-            f"Content-Length: {len(body)}\r\n"
-            "Connection: close\r\n\r\n"
-        )
         try:
-            conn.sendall(header.encode("utf-8") + body.encode("utf-8"))
+            send_response(conn, self.build_error(code, reason, message))
         except Exception:
             pass
         conn.close()
@@ -266,54 +572,38 @@ class HttpAdapter:
     # =====================================================
     # =============== Helper: handle login ================
     # =====================================================
-    def _handle_login(self, conn, req):
+    def session(self, req):
+        """Return the live :class:`Session <Session>` named by the cookie of
+        ``req``, or ``None``."""
+        return get_sessions().get(req.cookies.get(SESSION_COOKIE))
+
+    def _handle_login(self, req):
         """Process POST /login."""
-        global SESSION_COUNTER
         try:
-            data = {}
             try:
-                data = json.loads(req.body)
-            except json.JSONDecodeError:
-                for pair in req.body.split("&"):
-                    if "=" in pair:
-                        k, v = pair.split("=", 1)
-                        data[k] = v
+                data = req.json()
+            except ValueError:
+                data = req.form()
 
             username = data.get("username")
             password = data.get("password")
 
             if username == "admin" and password == "password":
-                SESSION_COUNTER += 1
-                session_id = str(SESSION_COUNTER)
-                SESSIONS[session_id] = True
-                file_path = os.path.join("www", "index.html")
-                with open(file_path, "r", encoding="utf-8") as f:
-                    body = f.read()
-
-                header = (
-                    "HTTP/1.1 200 OK\r\n"
-                    "Content-Type: text/html; charset=utf-8\r\n"
-                    f"Set-Cookie: session_id={session_id}; Path=/; HttpOnly\r\n"
-                    f"Content-Length: {len(body.encode('utf-8'))}\r\n"
-                    "Connection: close\r\n\r\n"
+                sessions = get_sessions()
+                session_id = sessions.create({"username": username})
+                asset = ASSET_CACHE.get(resolve_path("www", "index.html"))
+                body = asset.body
+
+                cookie = (
+                    f"Set-Cookie: {SESSION_COOKIE}={session_id}; Path=/; HttpOnly; "
+                    f"SameSite=Lax; Max-Age={int(sessions.absolute_ttl)}\r\n"
                 )
-                conn.sendall(header.encode("utf-8") + body.encode("utf-8"))
-                conn.close()
-                return
-            else:
-                template = RESPONSE_TEMPLATES["login_failed"]
+                return join_response(self.build_header(200, asset.content_type, len(body),
+                                                       cookie.encode("utf-8")), body)
         except Exception as e:
-            print(f"[HttpAdapter] Login error: {e}")
-            template = RESPONSE_TEMPLATES["login_failed"]
-
-        header = (
-            f"HTTP/1.1 {template['status']}\r\n"
-            f"Content-Type: {template['content_type']}\r\n"
-            f"Content-Length: {len(template['body'])}\r\n"
-            "Connection: close\r\n\r\n"
-        )
-        conn.sendall(header.encode("utf-8") + template["body"])
-        conn.close()
+            log.warning("Login error: %s", e)
+
+        return render_template("login_failed", keep_alive=self.keep_alive)
 
     # =====================================================
     # =============== Cookie Utilities ====================
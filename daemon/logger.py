@@ -0,0 +1,245 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.logger
+~~~~~~~~~~~~~~~~~
+
+This module provides the logging pipeline of the daemon. Request threads
+never write to stdout themselves:
+
+- a call below the configured level returns after one integer comparison,
+  before any formatting;
+- an enabled call %-formats its message on the calling thread, while
+  mutable arguments (routes, headers) still hold the values of the call,
+  and appends a ``(time, level, name, message)`` record to a
+  ``collections.deque``, which is atomic without taking a lock;
+- a background writer thread wakes every ``FLUSH_INTERVAL`` seconds, renders
+  the pending records as lines and writes them with one ``write`` per batch.
+
+When more than ``MAX_PENDING`` records are waiting (stdout blocked, log
+storm) new records are dropped and counted instead of growing memory; the
+writer reports the count. Forked prefork workers reset the pipeline and
+start their own writer on first use.
+
+Access lines are structured ``key=value`` records: method, path, status,
+bytes, duration and client.
+
+The level comes from ``WEAPROUS_LOG_LEVEL`` (default ``info``) and can be
+changed with :func:`configure`.
+
+Usage Example:
+--------------
+>>> log = get_logger("Backend")
+>>> log.info("Listening on port %s", 9000)
+>>> log.debug("parsed %r", headers)     # free when debug is off
+>>> access_log("GET", "/index.html", 200, 1024, 0.0012, ("127.0.0.1", 50000))
+"""
+
+import atexit
+import collections
+import os
+import sys
+import threading
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+#: Level names accepted by :func:`configure`.
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+_NAMES = {value: name.upper() for name, value in LEVELS.items()}
+
+#: Seconds between two batches written by the background writer.
+FLUSH_INTERVAL = 0.1
+#: Records allowed to wait for the writer before new ones are dropped.
+MAX_PENDING = 100000
+
+
+class LogPipeline:
+    """The :class:`LogPipeline <LogPipeline>` object queues log records and
+    writes them in batches from a background thread.
+
+    :attrs level (int): records below this level are discarded at the call.
+    :attrs stream (file): where batches are written, ``sys.stdout`` if None.
+    """
+
+    def __init__(self, level=INFO, stream=None):
+        self.level = level
+        self.stream = stream
+        self.dropped = 0
+        self._pending = collections.deque()
+        self._thread = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+
+    def emit(self, level, name, message, args):
+        """Queues one record; called by :class:`Logger <Logger>`."""
+        if self._thread is None:
+            self._start()
+        if len(self._pending) >= MAX_PENDING:
+            self.dropped += 1
+            return
+        self._pending.append((time.time(), level, name, format_message(message, args)))
+
+    def flush(self):
+        """Formats and writes every pending record."""
+        pending = self._pending
+        if not pending and not self.dropped:
+            return
+        lines = []
+        while pending:
+            try:
+                lines.append(format_record(*pending.popleft()))
+            except IndexError:
+                break
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            lines.append(format_record(time.time(), WARNING, "Logger",
+                                       "dropped %d records" % dropped))
+        stream = self.stream or sys.stdout
+        try:
+            stream.write("".join(lines))
+            stream.flush()
+        except (OSError, ValueError):
+            pass
+
+    def close(self):
+        """Stops the writer after a last flush."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(FLUSH_INTERVAL * 10)
+        self.flush()
+
+    def after_fork(self):
+        """Resets the pipeline in a forked child: the writer thread did not
+        survive the fork, and inherited records belong to the parent."""
+        self._pending.clear()
+        self._thread = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            thread.start()
+            self._thread = thread
+
+    def _run(self):
+        while not self._stop.wait(FLUSH_INTERVAL):
+            self.flush()
+
+
+def format_message(message, args):
+    """Applies the %-style ``args`` of a call to its ``message``."""
+    if args:
+        try:
+            return message % args
+        except (TypeError, ValueError):
+            return "{} {}".format(message, args)
+    return message
+
+
+def format_record(created, level, name, message):
+    """Renders one record as a text line."""
+    return "{}.{:03d} {:<7} [{}] {}\n".format(
+        time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created)),
+        int(created % 1 * 1000), _NAMES.get(level, level), name, message)
+
+
+#: Pipeline shared by every logger of the process.
+PIPELINE = LogPipeline(LEVELS.get(os.environ.get("WEAPROUS_LOG_LEVEL", "info").lower(), INFO))
+atexit.register(PIPELINE.close)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=PIPELINE.after_fork)
+
+
+class Logger:
+    """A named front end of the :data:`PIPELINE`; the name is the tag that
+    prefixed the former ``print`` lines, e.g. ``Backend`` or ``HttpAdapter``.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def enabled(self, level):
+        """``True`` if records of ``level`` are kept; guards costly arguments."""
+        return level >= PIPELINE.level
+
+    def debug(self, message, *args):
+        if DEBUG >= PIPELINE.level:
+            PIPELINE.emit(DEBUG, self.name, message, args)
+
+    def info(self, message, *args):
+        if INFO >= PIPELINE.level:
+            PIPELINE.emit(INFO, self.name, message, args)
+
+    def warning(self, message, *args):
+        if WARNING >= PIPELINE.level:
+            PIPELINE.emit(WARNING, self.name, message, args)
+
+    def error(self, message, *args):
+        if ERROR >= PIPELINE.level:
+            PIPELINE.emit(ERROR, self.name, message, args)
+
+
+_loggers = {}
+
+
+def get_logger(name):
+    """Returns the :class:`Logger <Logger>` tagged ``name``."""
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers.setdefault(name, Logger(name))
+    return logger
+
+
+def access_log(method, path, status, nbytes, duration, client=None):
+    """
+    Queues a structured access line for one served request.
+
+    :param method (str): request method.
+    :param path (str): request target.
+    :param status (int): response status code.
+    :param nbytes (int): response size in bytes, header included.
+    :param duration (float): seconds from parsed request to built response.
+    :param client (tuple): client address, if known.
+    """
+    if INFO >= PIPELINE.level:
+        PIPELINE.emit(INFO, "Access",
+                      "method=%s path=%s status=%s bytes=%d duration_ms=%.2f client=%s",
+                      (method, path, status, nbytes, duration * 1000.0,
+                       "{}:{}".format(*client[:2]) if client else "-"))
+
+
+def configure(level=None, stream=None):
+    """
+    Changes the level and/or the output stream of the pipeline.
+
+    :param level (str | int): ``debug``, ``info``, ``warning``, ``error`` or
+                              a numeric level.
+    :param stream (file): text stream to write to.
+    """
+    if level is not None:
+        if isinstance(level, str):
+            if level.lower() not in LEVELS:
+                raise ValueError("Unknown log level {}".format(level))
+            level = LEVELS[level.lower()]
+        PIPELINE.level = level
+    if stream is not None:
+        PIPELINE.stream = stream
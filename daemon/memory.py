@@ -0,0 +1,253 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.memory
+~~~~~~~~~~~~~~~~~
+
+This module provides the memory diagnostics of the daemon, built on the
+stdlib ``tracemalloc``:
+
+- snapshots kept in memory (the last ``MAX_SNAPSHOTS``), each tagged with
+  the traced memory and the live sizes of the watched structures;
+- the top-N allocation sites of a snapshot, grouped by ``lineno`` or
+  ``filename``;
+- the diff between two snapshots, the quickest way to find what grows.
+
+Global structures that grow with traffic (sessions, peers, channels,
+messages) are registered with :meth:`MemoryDiagnostics.watch` as callables
+returning their size, sampled by every snapshot and by the index.
+
+Tracing costs memory and CPU on every allocation, so it is opt-in:
+``create_backend(memory=True)`` (or a number of frames per traceback)
+starts ``tracemalloc`` and serves the endpoint. Taking a snapshot walks every
+traced block and holds the GIL meanwhile; expect a pause on a large heap.
+
+- ``GET /debug/memory``: traced memory, watched sizes and kept snapshots;
+- ``POST /debug/memory?start[&frames=N]`` / ``?stop``: control tracing;
+- ``POST /debug/memory/snapshot``: take and keep a snapshot;
+- ``GET /debug/memory/top?limit=20&by=lineno``: top sites of a fresh
+  snapshot (or ``&id=N`` of a kept one);
+- ``GET /debug/memory/diff?from=1[&to=2]&limit=20``: growth between two kept
+  snapshots, or from one to now.
+
+Usage Example:
+--------------
+>>> MEMORY.watch("active_peers", lambda: len(active_peers))
+>>> MEMORY.start(frames=5)
+>>> first = MEMORY.snapshot()
+>>> MEMORY.diff(first["id"], limit=10)
+"""
+
+import collections
+import threading
+import time
+import tracemalloc
+
+from .logger import get_logger
+
+log = get_logger("Memory")
+
+#: Path of the endpoint when memory diagnostics are enabled.
+MEMORY_ENDPOINT = "/debug/memory"
+#: Snapshots kept for diffs, oldest dropped first.
+MAX_SNAPSHOTS = 8
+#: Allocation sites returned by default.
+DEFAULT_TOP = 20
+#: Frames stored per traceback when tracing is started by default.
+DEFAULT_FRAMES = 1
+#: Groupings accepted by :meth:`MemoryDiagnostics.top`.
+GROUP_BY = ("lineno", "filename", "traceback")
+
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class MemoryDiagnostics:
+    """The :class:`MemoryDiagnostics <MemoryDiagnostics>` object drives
+    ``tracemalloc`` and keeps the snapshots of the process.
+
+    :attrs endpoint (str): endpoint path, ``None`` when disabled.
+    """
+
+    def __init__(self):
+        self.endpoint = None
+        self._watched = {}
+        self._snapshots = collections.OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def enable(self, frames=None):
+        """Serves the endpoint and starts tracing."""
+        self.endpoint = MEMORY_ENDPOINT
+        self.start(frames)
+
+    def owns(self, path):
+        """``True`` if ``path`` is served by the memory endpoint."""
+        if self.endpoint is None or path is None:
+            return False
+        path = path.partition("?")[0]
+        return path == self.endpoint or path.startswith(self.endpoint + "/")
+
+    # ------------------ Watched structures ------------------
+    def watch(self, name, target):
+        """
+        Reports the value returned by ``target`` as ``name``, sampled on each
+        read of :meth:`sizes`.
+
+        :param target (callable): returns a number, e.g. ``lambda: len(peers)``.
+        """
+        if not callable(target):
+            raise TypeError("watch target of {!r} must be callable".format(name))
+        self._watched[name] = target
+
+    def unwatch(self, name):
+        self._watched.pop(name, None)
+
+    def sizes(self):
+        """Returns ``{name: size}`` of the watched structures."""
+        sizes = {}
+        for name, target in list(self._watched.items()):
+            try:
+                sizes[name] = target()
+            except Exception as e:
+                sizes[name] = "error: {}".format(e)
+        return sizes
+
+    # ------------------ Tracing ------------------
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self, frames=None):
+        if tracemalloc.is_tracing():
+            return
+        frames = max(1, int(frames or DEFAULT_FRAMES))
+        tracemalloc.start(frames)
+        log.info("tracemalloc started with %s frame(s) per traceback", frames)
+
+    def stop(self):
+        """Stops tracing; kept snapshots are dropped with the traces."""
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+
+    def _take(self):
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing")
+        return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+    def _meta(self, snapshot_id, taken, sizes):
+        current, peak = tracemalloc.get_traced_memory() if self.tracing else (0, 0)
+        return {"id": snapshot_id, "time": taken, "traced_bytes": current,
+                "peak_bytes": peak, "sizes": sizes}
+
+    # ------------------ Snapshots ------------------
+    def snapshot(self):
+        """
+        Takes and keeps a snapshot.
+
+        :rtype dict: its metadata: ``id``, ``time``, traced memory, sizes.
+        :raises RuntimeError: tracing is off.
+        """
+        snapshot = self._take()
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            meta = self._meta(snapshot_id, time.time(), self.sizes())
+            self._snapshots[snapshot_id] = (snapshot, meta)
+            while len(self._snapshots) > MAX_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+        return meta
+
+    def _get(self, snapshot_id):
+        with self._lock:
+            entry = self._snapshots.get(snapshot_id)
+        if entry is None:
+            raise KeyError("No snapshot {}".format(snapshot_id))
+        return entry
+
+    def top(self, limit=DEFAULT_TOP, by="lineno", snapshot_id=None):
+        """
+        Returns the largest allocation sites.
+
+        :param limit (int): number of sites.
+        :param by (str): ``lineno``, ``filename`` or ``traceback``.
+        :param snapshot_id (int): kept snapshot, ``None`` for a fresh one.
+
+        :raises RuntimeError: tracing is off.
+        :raises KeyError: unknown snapshot.
+        :raises ValueError: unknown grouping.
+        """
+        if by not in GROUP_BY:
+            raise ValueError("Unknown grouping {!r}".format(by))
+        if snapshot_id is None:
+            snapshot, meta = self._take(), self._meta(None, time.time(), self.sizes())
+        else:
+            snapshot, meta = self._get(snapshot_id)
+        stats = snapshot.statistics(by)
+        return dict(meta, by=by, total_bytes=sum(stat.size for stat in stats),
+                    top=[_stat(stat) for stat in stats[:limit]])
+
+    def diff(self, from_id, to_id=None, limit=DEFAULT_TOP, by="lineno"):
+        """
+        Returns the allocation sites that grew most between two snapshots.
+
+        :param from_id (int): older kept snapshot.
+        :param to_id (int): newer kept snapshot, ``None`` for a fresh one.
+        """
+        if by not in GROUP_BY:
+            raise ValueError("Unknown grouping {!r}".format(by))
+        old, old_meta = self._get(from_id)
+        if to_id is None:
+            new, new_meta = self._take(), self._meta(None, time.time(), self.sizes())
+        else:
+            new, new_meta = self._get(to_id)
+        stats = new.compare_to(old, by)
+        return {
+            "from": old_meta,
+            "to": new_meta,
+            "by": by,
+            "size_diff": sum(stat.size_diff for stat in stats),
+            "top": [_stat(stat) for stat in stats[:limit]],
+        }
+
+    def index(self):
+        """Returns the JSON-ready state shown by the endpoint."""
+        with self._lock:
+            snapshots = [meta for _, meta in self._snapshots.values()]
+        return dict(self._meta(None, time.time(), self.sizes()),
+                    tracing=self.tracing, snapshots=snapshots)
+
+
+def _stat(stat):
+    """JSON form of a ``Statistic`` or ``StatisticDiff``."""
+    frame = stat.traceback[0]
+    entry = {
+        "site": "{}:{}".format(frame.filename, frame.lineno) if frame.lineno else frame.filename,
+        "size": stat.size,
+        "count": stat.count,
+    }
+    if len(stat.traceback) > 1:
+        entry["traceback"] = ["{}:{}".format(f.filename, f.lineno) for f in stat.traceback]
+    if hasattr(stat, "size_diff"):
+        entry["size_diff"] = stat.size_diff
+        entry["count_diff"] = stat.count_diff
+    return entry
+
+
+#: Memory diagnostics of the process.
+MEMORY = MemoryDiagnostics()
@@ -0,0 +1,252 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.metrics
+~~~~~~~~~~~~~~~~~
+
+This module provides the instrumentation of the backend daemon:
+
+- per route: request counts by method and status, an in-flight gauge and a
+  latency histogram with fixed buckets;
+- bytes received and sent, open and total connections;
+- for every :class:`WorkerPool <WorkerPool>`: queue wait histogram, busy
+  workers, queue depth and rejected jobs;
+- hits and misses of the static asset cache.
+
+Routes are labelled by their pattern (``/peer/<id>``), not by the raw path,
+so the number of series stays bounded; requests without a route hook are
+labelled ``<static>``. Methods outside :data:`KNOWN_METHODS` are labelled
+``other``, whatever verb the client sent. Recording takes one uncontended
+lock and a ``bisect`` per request, cheap enough to stay on.
+
+The proxy records the same counters with ``create_proxy(metrics=True)``:
+its requests are labelled by the backend ``host:port`` they were forwarded
+to (``<unrouted>`` when no route matched).
+
+The data is rendered in the Prometheus text format by :func:`render`, which
+:class:`HttpAdapter <HttpAdapter>` (or the proxy) serves on
+:attr:`Metrics.endpoint` when it was enabled with
+``create_backend(metrics=True)`` (or a path).
+
+Usage Example:
+--------------
+>>> create_backend("0.0.0.0", 9000, routes={}, metrics=True)
+>>> # curl http://127.0.0.1:9000/metrics
+"""
+
+import bisect
+import threading
+import weakref
+
+from .static import ASSET_CACHE
+
+#: Upper bounds in seconds of the latency buckets (+Inf is implicit).
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+#: Label of requests served without a route hook (static files, login...).
+STATIC_ROUTE = "<static>"
+#: Path the endpoint is served on when enabled with ``metrics=True``.
+DEFAULT_ENDPOINT = "/metrics"
+#: Methods kept as label values; any other verb is counted as ``other``.
+KNOWN_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"))
+OTHER_METHOD = "other"
+
+
+class Histogram:
+    """Fixed-bucket histogram; the caller holds the registry lock."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RouteStats:
+    """Counters of one route label."""
+
+    __slots__ = ("in_flight", "requests", "latency")
+
+    def __init__(self):
+        self.in_flight = 0
+        #: (method, status) -> count
+        self.requests = {}
+        self.latency = Histogram()
+
+
+class Metrics:
+    """The :class:`Metrics <Metrics>` object holds every counter of the
+    process.
+
+    :attrs endpoint (str): path serving the metrics, ``None`` when disabled.
+    """
+
+    def __init__(self):
+        self.endpoint = None
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.connections_active = 0
+        self.connections_total = 0
+        self._routes = {}
+        self._queue_wait = {}
+        self._pools = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    # ------------------ Recording ------------------
+    def request_started(self, route, nbytes):
+        """A request of ``nbytes`` bytes was parsed for ``route``."""
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats()
+            stats.in_flight += 1
+            self.bytes_received += nbytes
+
+    def request_finished(self, route, method, status, nbytes, duration):
+        """The response to a request of ``route`` was built."""
+        if method not in KNOWN_METHODS:
+            method = OTHER_METHOD
+        with self._lock:
+            stats = self._routes[route]
+            stats.in_flight -= 1
+            key = (method, status)
+            stats.requests[key] = stats.requests.get(key, 0) + 1
+            stats.latency.observe(duration)
+            self.bytes_sent += nbytes
+
+    def connection_opened(self):
+        with self._lock:
+            self.connections_active += 1
+            self.connections_total += 1
+
+    def connection_closed(self):
+        with self._lock:
+            self.connections_active -= 1
+
+    def queue_waited(self, pool, seconds):
+        """A job of the worker pool named ``pool`` waited ``seconds``."""
+        with self._lock:
+            histogram = self._queue_wait.get(pool)
+            if histogram is None:
+                histogram = self._queue_wait[pool] = Histogram()
+            histogram.observe(seconds)
+
+    def register_pool(self, pool):
+        """Exports the gauges of a :class:`WorkerPool <WorkerPool>`."""
+        self._pools.add(pool)
+
+    # ------------------ Rendering ------------------
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format."""
+        with self._lock:
+            routes = {route: (stats.in_flight, dict(stats.requests), _copy(stats.latency))
+                      for route, stats in self._routes.items()}
+            queue_wait = {pool: _copy(h) for pool, h in self._queue_wait.items()}
+            totals = (self.bytes_received, self.bytes_sent,
+                      self.connections_active, self.connections_total)
+
+        out = []
+        _family(out, "weaprous_requests_total", "counter", "Requests served.")
+        for route, (_, requests, _) in sorted(routes.items()):
+            for (method, status), count in sorted(requests.items()):
+                out.append('weaprous_requests_total{{route="{}",method="{}",status="{}"}} {}'.format(
+                    _escape(route), _escape(method), status, count))
+
+        _family(out, "weaprous_requests_in_flight", "gauge", "Requests being handled.")
+        for route, (in_flight, _, _) in sorted(routes.items()):
+            out.append('weaprous_requests_in_flight{{route="{}"}} {}'.format(_escape(route), in_flight))
+
+        _family(out, "weaprous_request_duration_seconds", "histogram",
+                "Time from parsed request to built response.")
+        for route, (_, _, histogram) in sorted(routes.items()):
+            _histogram(out, "weaprous_request_duration_seconds",
+                       'route="{}"'.format(_escape(route)), histogram)
+
+        received, sent, active, total = totals
+        _family(out, "weaprous_bytes_received_total", "counter", "Request bytes received.")
+        out.append("weaprous_bytes_received_total {}".format(received))
+        _family(out, "weaprous_bytes_sent_total", "counter", "Response bytes sent.")
+        out.append("weaprous_bytes_sent_total {}".format(sent))
+        _family(out, "weaprous_connections_active", "gauge", "Open client connections.")
+        out.append("weaprous_connections_active {}".format(active))
+        _family(out, "weaprous_connections_total", "counter", "Accepted client connections.")
+        out.append("weaprous_connections_total {}".format(total))
+
+        _family(out, "weaprous_pool_queue_wait_seconds", "histogram",
+                "Time jobs waited in a worker pool queue.")
+        for pool, histogram in sorted(queue_wait.items()):
+            _histogram(out, "weaprous_pool_queue_wait_seconds",
+                       'pool="{}"'.format(_escape(pool)), histogram)
+
+        pools = [pool.stats() | {"name": pool.name} for pool in list(self._pools)]
+        for name, kind, key, help_text in (
+                ("weaprous_pool_workers", "gauge", "workers", "Worker threads."),
+                ("weaprous_pool_busy", "gauge", "busy", "Workers running a job."),
+                ("weaprous_pool_queue_depth", "gauge", "queue_depth", "Jobs waiting for a worker."),
+                ("weaprous_pool_rejected_total", "counter", "rejected", "Jobs rejected on a full queue.")):
+            _family(out, name, kind, help_text)
+            for stats in pools:
+                out.append('{}{{pool="{}"}} {}'.format(name, _escape(stats["name"]), stats[key]))
+
+        cache = ASSET_CACHE.stats()
+        _family(out, "weaprous_static_cache_hits_total", "counter", "Static asset cache hits.")
+        out.append("weaprous_static_cache_hits_total {}".format(cache["hits"]))
+        _family(out, "weaprous_static_cache_misses_total", "counter", "Static asset cache misses.")
+        out.append("weaprous_static_cache_misses_total {}".format(cache["misses"]))
+        _family(out, "weaprous_static_cache_bytes", "gauge", "Bytes held by the static asset cache.")
+        out.append("weaprous_static_cache_bytes {}".format(cache["size"]))
+        return "\n".join(out) + "\n"
+
+
+def _copy(histogram):
+    copy = Histogram()
+    copy.counts = list(histogram.counts)
+    copy.sum = histogram.sum
+    copy.count = histogram.count
+    return copy
+
+
+def _family(out, name, kind, help_text):
+    out.append("# HELP {} {}".format(name, help_text))
+    out.append("# TYPE {} {}".format(name, kind))
+
+
+def _histogram(out, name, labels, histogram):
+    cumulative = 0
+    for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+        cumulative += count
+        out.append('{}_bucket{{{},le="{}"}} {}'.format(name, labels, bound, cumulative))
+    out.append('{}_bucket{{{},le="+Inf"}} {}'.format(name, labels, histogram.count))
+    out.append("{}_sum{{{}}} {}".format(name, labels, histogram.sum))
+    out.append("{}_count{{{}}} {}".format(name, labels, histogram.count))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+#: Metrics of the process, shared by every engine.
+METRICS = Metrics()
+
+
+def route_label(req):
+    """Returns the route label of a prepared request."""
+    if req.hook is not None:
+        return getattr(req.hook, "_route_path", None) or getattr(req.hook, "__name__", "<hook>")
+    return STATIC_ROUTE
@@ -0,0 +1,162 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.prefork
+~~~~~~~~~~~~~~~~~
+
+This module provides a prefork supervisor for the backend daemon. Python
+threads share one GIL, so a single backend process tops out at about one CPU
+core. The supervisor forks N worker processes that each bind the same port
+with ``SO_REUSEPORT`` and run their own accept loop; the kernel balances new
+connections across them.
+
+The supervisor process does not serve requests. It:
+
+- restarts a worker that exits unexpectedly, backing off when a worker keeps
+  crashing right after start;
+- forwards SIGTERM/SIGINT to the workers, waits for them and exits cleanly.
+
+Notes:
+------
+- Requires ``os.fork`` and ``SO_REUSEPORT`` (Linux, BSD, macOS).
+- Every worker has its own memory: module level state such as sessions or
+  registries is not shared between workers.
+
+Usage Example:
+--------------
+>>> create_backend("0.0.0.0", 9000, routes={}, processes=4)
+
+"""
+
+import os
+import signal
+import socket
+import time
+
+from .logger import PIPELINE, get_logger
+
+log = get_logger("Prefork")
+
+#: A worker that dies sooner than this after start counts as a crash loop.
+MIN_WORKER_UPTIME = 1.0
+#: Upper bound of the delay before restarting a crash-looping worker.
+MAX_RESTART_DELAY = 10.0
+
+
+def prefork_supported():
+    """Returns ``True`` when the platform can fork workers sharing a port."""
+    return hasattr(os, "fork") and hasattr(socket, "SO_REUSEPORT")
+
+
+class Supervisor:
+    """The :class:`Supervisor <Supervisor>` object forks and babysits the
+    worker processes.
+
+    :attrs target (callable): function each worker runs, e.g. the accept loop.
+    :attrs processes (int): number of worker processes to keep alive.
+    """
+
+    def __init__(self, target, processes, args=(), kwargs=None):
+        self.target = target
+        self.processes = processes
+        self.args = args
+        self.kwargs = kwargs or {}
+        #: pid -> (slot, start time)
+        self.workers = {}
+        self.stopping = False
+        self._delay = {}
+
+    def spawn(self, slot):
+        """Forks the worker for ``slot`` and returns its pid."""
+        pid = os.fork()
+        if pid == 0:
+            # Worker: default signal behaviour, serve until killed
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                self.target(*self.args, **self.kwargs)
+            except Exception as e:
+                log.error("worker %s error: %s", os.getpid(), e)
+                code = 1
+            finally:
+                # os._exit skips atexit: write the pending log lines first
+                PIPELINE.close()
+                os._exit(code)
+        self.workers[pid] = (slot, time.monotonic())
+        log.info("Started worker %s (pid %s)", slot, pid)
+        return pid
+
+    def stop(self, signum=None, frame=None):
+        """Signal handler: stop restarting and terminate the workers."""
+        if self.stopping:
+            return
+        self.stopping = True
+        log.info("Stopping %s workers", len(self.workers))
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        """Starts the workers and supervises them until they all exited."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        for slot in range(self.processes):
+            self.spawn(slot)
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            if pid not in self.workers:
+                continue
+            slot, started = self.workers.pop(pid)
+            if self.stopping:
+                continue
+
+            uptime = time.monotonic() - started
+            log.warning("Worker %s (pid %s) exited with status %s after %.1fs",
+                        slot, pid, status, uptime)
+            if uptime < MIN_WORKER_UPTIME:
+                delay = min(self._delay.get(slot, 0.5) * 2, MAX_RESTART_DELAY)
+                self._delay[slot] = delay
+                time.sleep(delay)
+                if self.stopping:
+                    continue
+            else:
+                self._delay.pop(slot, None)
+            self.spawn(slot)
+
+        log.info("All workers stopped")
+
+
+def run_prefork(target, processes, args=(), kwargs=None):
+    """
+    Runs ``target(*args, **kwargs)`` in ``processes`` supervised worker processes.
+
+    :param target (callable): worker entry point; it must bind its listening
+                              socket with ``SO_REUSEPORT``.
+    :param processes (int): number of worker processes.
+    :param args (tuple): positional arguments for ``target``.
+    :param kwargs (dict): keyword arguments for ``target``.
+    """
+    if not prefork_supported():
+        log.warning("fork/SO_REUSEPORT unavailable, running a single process")
+        kwargs = dict(kwargs or {}, reuse_port=False)
+        target(*args, **kwargs)
+        return
+    Supervisor(target, processes, args, kwargs).run()
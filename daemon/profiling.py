@@ -0,0 +1,394 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.profiling
+~~~~~~~~~~~~~~~~~
+
+This module provides the profilers of the daemon processes.
+
+:class:`RequestProfiler <RequestProfiler>` captures route handlers with
+``cProfile`` on demand. The
+profiler is idle until it is armed at runtime, either for the next N hook
+calls or for a sampled fraction of them; each captured call is written to
+``<directory>/<time>_<pid>_<route>_<method>.pstats`` for ``pstats`` or
+snakeviz.
+
+Only one handler is profiled at a time (``cProfile`` cannot run two
+profilers at once on Python 3.12+); a call arriving while another is being
+profiled simply runs unprofiled.
+
+When enabled with ``create_backend(profiling=True)`` (or a directory),
+:class:`HttpAdapter <HttpAdapter>` serves a small control endpoint:
+
+- ``GET /debug/profiles``: JSON index of the captured profiles and the
+  current arming;
+- ``POST /debug/profiles?next=N`` / ``?rate=0.05`` / ``?off``: arm or disarm;
+- ``GET /debug/profiles/<file>``: download one ``.pstats`` file.
+
+:class:`StackSampler <StackSampler>` is a statistical profiler cheap enough
+to leave running under real load: a background thread reads
+``sys._current_frames()`` ``hz`` times a second and counts every thread's
+stack in the folded format of ``flamegraph.pl`` / speedscope
+(``thread;file:function;... count``). Worker threads are grouped by name
+without their number, so all the workers of a pool fold into one tree. The
+aggregate is served on ``/debug/stacks`` with ``create_backend(sampling=True)``
+and written to ``<directory>/stacks_<pid>_<time>.folded`` on ``SIGUSR2``,
+which also works for the proxy (``create_proxy(sampling=True)``).
+
+Usage Example:
+--------------
+>>> PROFILER.arm(5)                       # profile the next 5 hook calls
+>>> PROFILER.call("/api/send", "POST", handler, headers=h, body=b)
+>>> SAMPLER.start(hz=100)
+>>> SAMPLER.install_signal()              # kill -USR2 <pid> dumps the stacks
+>>> print(SAMPLER.folded())
+"""
+
+import collections
+import cProfile
+import os
+import random
+import re
+import signal
+import sys
+import threading
+import time
+
+from .logger import get_logger
+
+log = get_logger("Profiler")
+
+#: Path of the control endpoint when profiling is enabled.
+PROFILES_ENDPOINT = "/debug/profiles"
+#: Directory the ``.pstats`` files are written to by default.
+DEFAULT_PROFILE_DIR = "profiles"
+#: Captured profiles listed by the index, most recent last.
+MAX_INDEXED_PROFILES = 200
+#: Path of the stack sampler endpoint when sampling is enabled.
+STACKS_ENDPOINT = "/debug/stacks"
+#: Stack samples taken per second by default.
+DEFAULT_SAMPLE_HZ = 100
+#: Frames kept per stack, counted from the outermost one.
+MAX_STACK_DEPTH = 128
+
+
+class RequestProfiler:
+    """The :class:`RequestProfiler <RequestProfiler>` object decides which
+    handler calls are profiled and keeps the index of captured files.
+
+    :attrs directory (str): where ``.pstats`` files are written.
+    :attrs endpoint (str): control endpoint path, ``None`` when disabled.
+    :attrs remaining (int): calls still to profile after :meth:`arm`.
+    :attrs rate (float): fraction of calls profiled after :meth:`sample`.
+    """
+
+    def __init__(self, directory=DEFAULT_PROFILE_DIR):
+        self.directory = directory
+        self.endpoint = None
+        self.remaining = 0
+        self.rate = 0.0
+        self.profiles = collections.deque(maxlen=MAX_INDEXED_PROFILES)
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+
+    def enable(self, directory=None):
+        """Serves the control endpoint; ``directory`` overrides the output."""
+        if directory:
+            self.directory = directory
+        self.endpoint = PROFILES_ENDPOINT
+
+    def arm(self, count):
+        """Profiles the next ``count`` handler calls."""
+        with self._lock:
+            self.remaining = max(int(count), 0)
+        log.info("Profiling the next %s handler calls into %s", self.remaining, self.directory)
+
+    def sample(self, rate):
+        """Profiles each handler call with probability ``rate`` (0 disables)."""
+        with self._lock:
+            self.rate = min(max(float(rate), 0.0), 1.0)
+        log.info("Profiling %.1f%% of handler calls into %s", self.rate * 100, self.directory)
+
+    def disarm(self):
+        with self._lock:
+            self.remaining = 0
+            self.rate = 0.0
+
+    def owns(self, path):
+        """``True`` if ``path`` is served by the control endpoint."""
+        if self.endpoint is None or path is None:
+            return False
+        path = path.partition("?")[0]
+        return path == self.endpoint or path.startswith(self.endpoint + "/")
+
+    def should_profile(self):
+        # Unlocked fast path: nothing armed, which is almost always the case
+        if not self.remaining and not self.rate:
+            return False
+        with self._lock:
+            if self.remaining:
+                self.remaining -= 1
+                return True
+        return self.rate > 0.0 and random.random() < self.rate
+
+    def call(self, route, method, func, *args, **kwargs):
+        """
+        Runs ``func(*args, **kwargs)``, under ``cProfile`` when this call is
+        selected, and returns its result.
+
+        :param route (str): route label used in the file name.
+        :param method (str): request method used in the file name.
+        """
+        if not self.should_profile() or not self._busy.acquire(blocking=False):
+            return func(*args, **kwargs)
+        profile = cProfile.Profile()
+        started = time.time()
+        try:
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            self._busy.release()
+            self._save(profile, route, method, started, time.time() - started)
+
+    async def call_async(self, route, method, func, *args, **kwargs):
+        """
+        Awaits ``func(*args, **kwargs)`` like :meth:`call`; for coroutine
+        hooks awaited on the event loop of the asyncio engine. Other tasks
+        resumed while the hook is suspended are recorded in its profile too.
+        """
+        if not self.should_profile() or not self._busy.acquire(blocking=False):
+            return await func(*args, **kwargs)
+        profile = cProfile.Profile()
+        started = time.time()
+        profile.enable()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            profile.disable()
+            self._busy.release()
+            self._save(profile, route, method, started, time.time() - started)
+
+    def _save(self, profile, route, method, started, duration):
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", route).strip("-") or "root"
+        name = "{}-{:03d}_{}_{}_{}.pstats".format(
+            time.strftime("%Y%m%d-%H%M%S", time.localtime(started)),
+            int(started % 1 * 1000), os.getpid(), slug, method)
+        path = os.path.join(self.directory, name)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            profile.dump_stats(path)
+        except OSError as e:
+            log.error("Cannot write profile %s: %s", path, e)
+            return
+        self.profiles.append({
+            "file": name,
+            "route": route,
+            "method": method,
+            "time": started,
+            "duration_ms": round(duration * 1000.0, 3),
+        })
+        log.info("Captured profile %s (%.1f ms)", name, duration * 1000.0)
+
+    def index(self):
+        """Returns the JSON-ready state shown by the control endpoint."""
+        return {
+            "directory": self.directory,
+            "remaining": self.remaining,
+            "rate": self.rate,
+            "profiles": list(self.profiles),
+        }
+
+    def profile_path(self, name):
+        """Returns the path of an indexed profile, ``None`` if unknown."""
+        if any(entry["file"] == name for entry in list(self.profiles)):
+            return os.path.join(self.directory, name)
+        return None
+
+
+#: Profiler shared by every engine of the process.
+PROFILER = RequestProfiler()
+
+
+class StackSampler:
+    """The :class:`StackSampler <StackSampler>` object samples the stacks of
+    every thread from a background thread and aggregates them.
+
+    :attrs directory (str): where :meth:`dump` writes ``.folded`` files.
+    :attrs endpoint (str): endpoint path, ``None`` when not served.
+    :attrs hz (int): samples per second.
+    :attrs samples (int): samples taken since the last :meth:`reset`.
+    """
+
+    def __init__(self, directory=DEFAULT_PROFILE_DIR):
+        self.directory = directory
+        self.endpoint = None
+        self.hz = DEFAULT_SAMPLE_HZ
+        self.samples = 0
+        self._stacks = collections.Counter()
+        self._labels = {}
+        self._thread = None
+        self._stop = threading.Event()
+        # Reentrant: the SIGUSR2 handler may interrupt folded() on its thread
+        self._lock = threading.RLock()
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def enable(self, hz=None, directory=None):
+        """Serves the endpoint and starts sampling at ``hz``."""
+        if directory:
+            self.directory = directory
+        self.endpoint = STACKS_ENDPOINT
+        self.start(hz)
+
+    def owns(self, path):
+        """``True`` if ``path`` is served by the sampler endpoint."""
+        if self.endpoint is None or path is None:
+            return False
+        return path.partition("?")[0] == self.endpoint
+
+    def start(self, hz=None):
+        """Starts the sampling thread (a running one only changes rate)."""
+        if hz:
+            self.hz = max(1, min(int(hz), 1000))
+        if self._thread is not None:
+            return
+        self._stop = threading.Event()
+        thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread = thread
+        thread.start()
+        log.info("Sampling thread stacks at %s Hz", self.hz)
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            if thread is not threading.current_thread():
+                thread.join(1.0)
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+    def after_fork(self):
+        """Restarts sampling in a forked child with its own counts: the
+        sampling thread did not survive the fork."""
+        running = self._thread is not None
+        self._thread = None
+        self._lock = threading.RLock()
+        self.reset()
+        if running:
+            self.start()
+
+    def _run(self):
+        stop = self._stop
+        own = threading.get_ident()
+        names = {}
+        refreshed = 0.0
+        while not stop.wait(1.0 / self.hz):
+            frames = sys._current_frames()
+            now = time.monotonic()
+            if now - refreshed >= 1.0 or not frames.keys() <= names.keys():
+                # Thread names change rarely; enumerate() is not free
+                names = {t.ident: _thread_group(t.name) for t in threading.enumerate()}
+                refreshed = now
+            stacks = [self._fold(names.get(ident, "thread"), frame)
+                      for ident, frame in frames.items() if ident != own]
+            del frames
+            with self._lock:
+                self._stacks.update(stacks)
+                self.samples += 1
+
+    def _fold(self, thread_name, frame):
+        labels = self._labels
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = labels.get(code)
+            if label is None:
+                label = labels[code] = "{}:{}".format(
+                    os.path.basename(code.co_filename), code.co_name).replace(";", ",")
+            stack.append(label)
+            frame = frame.f_back
+        stack.append(thread_name)
+        stack.reverse()
+        return ";".join(stack[:MAX_STACK_DEPTH])
+
+    def folded(self):
+        """Returns the aggregated stacks, one ``stack count`` line each."""
+        with self._lock:
+            stacks = sorted(self._stacks.items())
+        return "".join("{} {}\n".format(stack, count) for stack, count in stacks)
+
+    def status(self):
+        """Returns the JSON-ready state shown by the endpoint."""
+        return {
+            "running": self.running,
+            "hz": self.hz,
+            "samples": self.samples,
+            "stacks": len(self._stacks),
+        }
+
+    def dump(self, path=None):
+        """Writes :meth:`folded` to ``path`` (default under :attr:`directory`)
+        and returns the path."""
+        if path is None:
+            path = os.path.join(self.directory, "stacks_{}_{}.folded".format(
+                os.getpid(), time.strftime("%Y%m%d-%H%M%S")))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            f.write(self.folded())
+        return path
+
+    def install_signal(self, signum=getattr(signal, "SIGUSR2", None)):
+        """
+        Dumps the stacks when the process receives ``signum``; the first
+        signal starts the sampler if it is not running yet. Only possible
+        from the main thread, returns ``False`` otherwise.
+
+        The daemons install it at launch whether sampling was asked for or
+        not, so ``kill -USR2`` starts sampling a running process instead of
+        terminating it.
+        """
+        if signum is None:
+            return False
+        try:
+            signal.signal(signum, self._on_signal)
+        except ValueError:
+            # Embedded daemons run off the main thread; only complain when
+            # sampling was asked for
+            (log.warning if self.running else log.debug)(
+                "Stack dumps on signal need the main thread")
+            return False
+        return True
+
+    def _on_signal(self, signum, frame):
+        if not self.running:
+            self.start()
+            return
+        try:
+            log.info("Stacks of %s samples written to %s", self.samples, self.dump())
+        except OSError as e:
+            log.error("Cannot dump stacks: %s", e)
+
+
+def _thread_group(name):
+    """``worker-12`` and ``Thread-3 (handle_client)`` fold into one group."""
+    return re.sub(r"[-_ ]?\d+", "", name).replace(";", ",") or "thread"
+
+
+#: Stack sampler of the process.
+SAMPLER = StackSampler()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=SAMPLER.after_fork)
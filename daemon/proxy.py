@@ -29,9 +29,20 @@ Requirement:
 """
 import socket
 import threading
+import time
 from .response import *
 from .httpadapter import HttpAdapter
 from .dictionary import CaseInsensitiveDict
+from .logger import get_logger
+from .profiling import SAMPLER
+from .metrics import METRICS, DEFAULT_ENDPOINT
+from .headers import build_header
+from .static import response_status
+
+log = get_logger("Proxy")
+
+#: Metrics route label of requests matching no entry of the routes.
+UNROUTED = "<unrouted>"
 
 #: A dictionary mapping hostnames to backend IP and port tuples.
 #: Used to determine routing targets for incoming requests.
@@ -67,7 +78,7 @@ def forward_request(host, port, request):
             response += chunk
         return response
     except socket.error as e:
-      print("Socket error: {}".format(e))
+      log.error("Socket error: %s", e)
       return (
             "HTTP/1.1 404 Not Found\r\n"
             "Content-Type: text/plain\r\n"
@@ -78,6 +89,24 @@ def forward_request(host, port, request):
         ).encode('utf-8')
 
 
+def force_connection_close(request):
+    """
+    Rewrites the hop-by-hop connection headers of a request so the backend
+    closes the connection after its response. :func:`forward_request` reads
+    the backend response until EOF, which a persistent connection never sends.
+
+    :params request (str): incoming HTTP request.
+
+    :rtype str: the request with a single ``Connection: close`` header.
+    """
+    head, sep, body = request.partition("\r\n\r\n")
+    lines = [line for line in head.split("\r\n")
+             if not line.lower().startswith(("connection:", "keep-alive:",
+                                             "proxy-connection:"))]
+    lines.append("Connection: close")
+    return "\r\n".join(lines) + "\r\n\r\n" + body
+
+
 def resolve_routing_policy(hostname, routes):
     """
     Handles an routing policy to return the matching proxy_pass.
@@ -88,17 +117,14 @@ def resolve_routing_policy(hostname, routes):
     :params routes (dict): dictionary mapping hostnames and location.
     """
 
-    print(hostname)
     proxy_map, policy = routes.get(hostname,('127.0.0.1:9000','round-robin'))
-    print(proxy_map)
-    print(policy)
+    log.debug("resolve %s -> %s (%s)", hostname, proxy_map, policy)
 
     proxy_host = ''
     proxy_port = '9000'
     if isinstance(proxy_map, list):
         if len(proxy_map) == 0:
-            print("[Proxy] Emtpy resolved routing of hostname {}".format(hostname))
-            print("Empty proxy_map result")
+            log.warning("Emtpy resolved routing of hostname %s", hostname)
             # TODO: implement the error handling for non mapped host
             #       the policy is design by team, but it can be 
             #       basic default host in your self-defined system
@@ -115,7 +141,7 @@ def resolve_routing_policy(hostname, routes):
             proxy_host = '127.0.0.1'
             proxy_port = '9000'
     else:
-        print("[Proxy] resolve route of hostname {} is a singulair to".format(hostname))
+        log.debug("resolve route of hostname %s is a singulair to", hostname)
         proxy_host, proxy_port = proxy_map.split(":", 2)
 
     return proxy_host, proxy_port
@@ -139,65 +165,89 @@ def handle_client(ip, port, conn, addr, routes):
     :params routes (dict): dictionary mapping hostnames and location.
     """
 
-    request_data = b""
-    while True:
-        chunk = conn.recv(4096)
-        if not chunk:
-            break
-        request_data += chunk
-        # HTTP header kết thúc bằng \r\n\r\n
-        if b"\r\n\r\n" in request_data:
-            break
-
+    METRICS.connection_opened()
     try:
-        request = request_data.decode("utf-8", errors="ignore")
-    except Exception:
-        request = ""
+        request_data = b""
+        while True:
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            request_data += chunk
+            # HTTP header kết thúc bằng \r\n\r\n
+            if b"\r\n\r\n" in request_data:
+                break
 
-    if not request.strip():
-        print("[Proxy] Empty request received from", addr)
+        try:
+            request = request_data.decode("utf-8", errors="ignore")
+        except Exception:
+            request = ""
+
+        if not request.strip():
+            log.warning("Empty request received from %s", addr)
+            conn.close()
+            return
+
+        # --- Lấy Host header ---
+        hostname = None
+        for line in request.splitlines():
+            if line.lower().startswith("host:"):
+                hostname = line.split(":", 1)[1].strip()
+                break
+
+        if not hostname:
+            log.warning("Missing Host header from %s", addr)
+            conn.sendall(
+                b"HTTP/1.1 400 Bad Request\r\nContent-Type: text/plain\r\n\r\nMissing Host header"
+            )
+            conn.close()
+            return
+
+        log.debug("%s at Host: %s", addr, hostname)
+
+        method, _, target = request.partition(" ")
+        path = target.split(" ", 1)[0].partition("?")[0]
+        if METRICS.endpoint is not None and path == METRICS.endpoint:
+            conn.sendall(metrics_response())
+            conn.close()
+            return
+
+        # Resolve the matching destination in routes and need conver port
+        # to integer value
+        resolved_host, resolved_port = resolve_routing_policy(hostname, routes)
+        try:
+            resolved_port = int(resolved_port)
+        except ValueError:
+            log.warning("Not a valid integer port %r", resolved_port)
+
+        started = time.monotonic()
+        route = "{}:{}".format(resolved_host, resolved_port) if resolved_host else UNROUTED
+        METRICS.request_started(route, len(request_data))
+        if resolved_host:
+            log.debug("Host name %s is forwarded to %s:%s", hostname, resolved_host, resolved_port)
+            response = forward_request(resolved_host, resolved_port,
+                                       force_connection_close(request))
+        else:
+            response = (
+                "HTTP/1.1 404 Not Found\r\n"
+                "Content-Type: text/plain\r\n"
+                "Content-Length: 13\r\n"
+                "Connection: close\r\n"
+                "\r\n"
+                "404 Not Found"
+            ).encode('utf-8')
+        METRICS.request_finished(route, method, response_status(response), len(response),
+                                 time.monotonic() - started)
+        conn.sendall(response)
         conn.close()
-        return
-
-    # --- Lấy Host header ---
-    hostname = None
-    for line in request.splitlines():
-        if line.lower().startswith("host:"):
-            hostname = line.split(":", 1)[1].strip()
-            break
-
-    if not hostname:
-        print("[Proxy] Missing Host header from", addr)
-        conn.sendall(
-            b"HTTP/1.1 400 Bad Request\r\nContent-Type: text/plain\r\n\r\nMissing Host header"
-        )
+    finally:
+        METRICS.connection_closed()
         conn.close()
-        return
-
-    print(f"[Proxy] {addr} at Host: {hostname}")
 
-    # Resolve the matching destination in routes and need conver port
-    # to integer value
-    resolved_host, resolved_port = resolve_routing_policy(hostname, routes)
-    try:
-        resolved_port = int(resolved_port)
-    except ValueError:
-        print("Not a valid integer")
-
-    if resolved_host:
-        print("[Proxy] Host name {} is forwarded to {}:{}".format(hostname,resolved_host, resolved_port))
-        response = forward_request(resolved_host, resolved_port, request)        
-    else:
-        response = (
-            "HTTP/1.1 404 Not Found\r\n"
-            "Content-Type: text/plain\r\n"
-            "Content-Length: 13\r\n"
-            "Connection: close\r\n"
-            "\r\n"
-            "404 Not Found"
-        ).encode('utf-8')
-    conn.sendall(response)
-    conn.close()
+def metrics_response():
+    """Returns the :data:`METRICS` of the proxy as a complete response."""
+    body = METRICS.render().encode("utf-8")
+    return build_header(200, "text/plain; version=0.0.4; charset=utf-8", len(body),
+                        b"Cache-Control: no-store\r\n", b"Connection: close\r\n") + body
 
 def run_proxy(ip, port, routes):
     """
@@ -219,7 +269,7 @@ def run_proxy(ip, port, routes):
     try:
         proxy.bind((ip, port))
         proxy.listen(50)
-        print("[Proxy] Listening on IP {} port {}".format(ip,port))
+        log.info("Listening on IP %s port %s", ip, port)
         while True:
             conn, addr = proxy.accept()
             #
@@ -231,15 +281,26 @@ def run_proxy(ip, port, routes):
             thread.daemon = True
             thread.start()
     except socket.error as e:
-      print("Socket error: {}".format(e))
+      log.error("Socket error: %s", e)
 
-def create_proxy(ip, port, routes):
+def create_proxy(ip, port, routes, sampling=False, metrics=False):
     """
     Entry point for launching the proxy server.
 
     :params ip (str): IP address to bind the proxy server.
     :params port (int): port number to listen on.
     :params routes (dict): dictionary mapping hostnames and location.
+    :params sampling (bool | int): run the stack sampler of :mod:`daemon.profiling`
+                                   (``True`` or a rate in Hz) from the start;
+                                   ``SIGUSR2`` starts it otherwise, then dumps it.
+    :params metrics (bool | str): serve :mod:`daemon.metrics` on ``/metrics`` (or
+                                  the given path) of any host: connections,
+                                  bytes, and requests by backend.
     """
+    if metrics:
+        METRICS.endpoint = metrics if isinstance(metrics, str) else DEFAULT_ENDPOINT
+    if sampling:
+        SAMPLER.start(None if sampling is True else sampling)
+    SAMPLER.install_signal()
 
     run_proxy(ip, port, routes)
@@ -0,0 +1,412 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.reactor
+~~~~~~~~~~~~~~~~~
+
+This module provides the reactor engine of the backend daemon, built on the
+stdlib ``selectors`` module (epoll on Linux, kqueue/poll/select elsewhere).
+A single thread accepts, reads, parses and writes every connection through
+non-blocking sockets, keeping a read and a write buffer per connection.
+
+Connections are kept alive between requests as negotiated by
+:class:`HttpAdapter <HttpAdapter>`; pipelined requests already sitting in the
+read buffer are served as soon as the previous response is written, and idle
+connections are closed after ``KEEPALIVE_TIMEOUT`` seconds. A client that
+stops reading its response is dropped after ``WRITE_TIMEOUT`` seconds without
+progress, and the listening socket is set aside for ``ACCEPT_BACKOFF`` seconds
+when accept runs out of file descriptors.
+
+Only requests that hit a route hook, and the blocking debug endpoints
+(profile downloads, tracemalloc snapshots and diffs), leave the reactor
+thread: they are handed to a small :class:`WorkerPool <WorkerPool>` and the
+finished response is passed back through a wake-up socket. Static files,
+login and the 401/404 template responses are built inline on the reactor
+thread; an error while building one is answered with 500 on that connection
+only. Responses are
+written with scatter ``sendmsg`` calls over the header and body buffers,
+resumed where a partial write stopped, and large static files are streamed
+with non-blocking ``os.sendfile``.
+
+Usage Example:
+--------------
+>>> create_backend("127.0.0.1", 9000, routes={}, engine="reactor")
+
+"""
+
+import collections
+import errno
+import os
+import selectors
+import socket
+import time
+
+from .httpadapter import HttpAdapter, render_template, KEEPALIVE_TIMEOUT
+from .reader import RequestReader, RequestError
+from .static import FileSegment, queue_parts, send_buffers
+from .workerpool import WorkerPool
+from .utils import create_listen_socket
+from .logger import get_logger
+from .metrics import METRICS
+from .profiling import PROFILER
+from .memory import MEMORY
+
+log = get_logger("Reactor")
+
+#: Number of worker threads running route hooks for the reactor.
+DEFAULT_REACTOR_WORKERS = 8
+#: Initial read buffer per connection; it grows for larger requests.
+READ_BUFFER_SIZE = 4096
+#: Large static files are sent with os.sendfile where the platform has it.
+HAS_SENDFILE = hasattr(os, "sendfile")
+#: Seconds a response may wait for the client to read more of it before the
+#: connection is dropped.
+WRITE_TIMEOUT = 30.0
+#: Seconds the listening socket is left unwatched when accept runs out of
+#: file descriptors, instead of waking the loop until one is freed.
+ACCEPT_BACKOFF = 0.5
+#: accept errors that leave the pending connection in the backlog.
+ACCEPT_EXHAUSTED = (errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.ENOMEM)
+
+
+class Connection:
+    """Per-connection state kept by the :class:`Reactor <Reactor>`."""
+
+    __slots__ = ("sock", "addr", "adapter", "reader", "pending", "segment",
+                 "file", "file_offset", "file_left", "events", "last_active")
+
+    def __init__(self, sock, addr, adapter):
+        self.sock = sock
+        self.addr = addr
+        self.adapter = adapter
+        #: bytes received and not yet parsed
+        self.reader = RequestReader(READ_BUFFER_SIZE)
+        #: parts of the response still to write: memoryviews of the unsent
+        #: bytes, and FileSegments
+        self.pending = collections.deque()
+        #: file part being sent, and the open file while sending it
+        self.segment = None
+        self.file = None
+        self.file_offset = 0
+        self.file_left = 0
+        #: selector events currently watched, 0 while a request is processed
+        self.events = 0
+        #: monotonic time of the last read, or of the last write progress
+        self.last_active = time.monotonic()
+
+
+class Reactor:
+    """The :class:`Reactor <Reactor>` object drives every client socket of
+    the backend from one selector loop.
+
+    :attrs ip (str): IP address to bind the server.
+    :attrs port (int): Port number to listen on.
+    :attrs routes (dict): Dictionary of route handlers.
+    :attrs pool (WorkerPool): runs route hooks off the reactor thread.
+    """
+
+    def __init__(self, ip, port, routes, pool_size=DEFAULT_REACTOR_WORKERS,
+                 queue_size=256, reuse_port=False):
+        self.ip = ip
+        self.port = port
+        self.routes = routes
+        self.reuse_port = reuse_port
+        self.selector = selectors.DefaultSelector()
+        self.pool = WorkerPool(pool_size, queue_size, "reject", name="reactor")
+
+        # Open client connections, swept for keep-alive idle timeouts
+        self.connections = set()
+        # Finished hook responses, handed back by the workers
+        self._done = collections.deque()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        # monotonic time at which accepting resumes, None while accepting
+        self._accept_resume = None
+
+    def serve_forever(self):
+        """Binds the listening socket and runs the event loop."""
+        server = create_listen_socket(self.ip, self.port, reuse_port=self.reuse_port)
+        server.setblocking(False)
+        self.pool.start()
+
+        self.selector.register(server, selectors.EVENT_READ)
+        self.selector.register(self._wake_r, selectors.EVENT_READ)
+        log.info("Listening on port %s (%s)", self.port, type(self.selector).__name__)
+        if self.routes != {}:
+            log.info("route settings %s", self.routes)
+
+        last_sweep = time.monotonic()
+        timeout = 1.0
+        while True:
+            for key, mask in self.selector.select(timeout=timeout):
+                if key.fileobj is server:
+                    self._accept(server)
+                elif key.fileobj is self._wake_r:
+                    self._drain_done()
+                elif mask & selectors.EVENT_READ:
+                    self._on_readable(key.data)
+                elif mask & selectors.EVENT_WRITE:
+                    self._on_writable(key.data)
+
+            now = time.monotonic()
+            timeout = 1.0
+            if self._accept_resume is not None:
+                if now >= self._accept_resume:
+                    self._accept_resume = None
+                    self.selector.register(server, selectors.EVENT_READ)
+                else:
+                    timeout = min(timeout, self._accept_resume - now)
+            if now - last_sweep >= 1.0:
+                last_sweep = now
+                self._sweep_idle(now)
+
+    # ------------------ Event handlers ------------------
+    def _accept(self, server):
+        while True:
+            try:
+                sock, addr = server.accept()
+            except BlockingIOError:
+                return
+            except OSError as e:
+                if e.errno in ACCEPT_EXHAUSTED:
+                    # The connection stays queued and the socket readable:
+                    # stop watching it for a while rather than spin
+                    log.warning("Accept paused for %.1fs: %s", ACCEPT_BACKOFF, e)
+                    self.selector.unregister(server)
+                    self._accept_resume = time.monotonic() + ACCEPT_BACKOFF
+                else:
+                    log.warning("Accept error: %s", e)
+                return
+            sock.setblocking(False)
+            conn = Connection(sock, addr,
+                              HttpAdapter(self.ip, self.port, sock, addr, self.routes))
+            self.connections.add(conn)
+            METRICS.connection_opened()
+            self._watch(conn, selectors.EVENT_READ)
+
+    def _on_readable(self, conn):
+        try:
+            received = conn.reader.fill(conn.sock)
+        except BlockingIOError:
+            return
+        except OSError:
+            self._close(conn)
+            return
+        if not received:
+            self._close(conn)
+            return
+
+        conn.last_active = time.monotonic()
+        self._next_request(conn)
+
+    def _next_request(self, conn):
+        """Processes the next complete request buffered on ``conn``, if any;
+        otherwise waits for more bytes."""
+        try:
+            parts = conn.reader.next_request()
+        except RequestError as e:
+            log.warning("Request rejected from %s: %s", conn.addr, e)
+            self._watch(conn, 0)
+            conn.adapter.keep_alive = False
+            self._respond(conn, conn.adapter.build_error(e.code, e.reason, str(e)))
+            return
+        if parts is None:
+            self._watch(conn, selectors.EVENT_READ)
+            return
+
+        # Stop watching the socket until the response for this request is ready
+        self._watch(conn, 0)
+        self._process(conn, *parts)
+
+    def _on_writable(self, conn):
+        if conn.segment is None and not conn.pending:
+            return
+        try:
+            while True:
+                if conn.segment is not None:
+                    self._send_segment(conn)
+                elif not conn.pending:
+                    break
+                elif isinstance(conn.pending[0], FileSegment):
+                    conn.segment = conn.pending.popleft()
+                elif not send_buffers(conn.sock, conn.pending):
+                    # Partial write: the socket buffer is full
+                    break
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._close(conn)
+            return
+        if conn.segment is not None or conn.pending:
+            # The client is still reading: WRITE_TIMEOUT counts from here
+            conn.last_active = time.monotonic()
+            self._watch(conn, selectors.EVENT_WRITE)
+            return
+
+        conn.last_active = time.monotonic()
+        if conn.adapter.keep_alive:
+            # Serve a pipelined request already buffered, or wait for one
+            self._next_request(conn)
+        else:
+            self._close(conn)
+
+    def _send_segment(self, conn):
+        """Sends the file body of the current response with non-blocking
+        ``os.sendfile`` until done or the socket buffer is full."""
+        if conn.file is None:
+            conn.file = open(conn.segment.path, "rb")
+            conn.file_offset = conn.segment.offset
+            conn.file_left = conn.segment.count
+        while conn.file_left > 0:
+            if HAS_SENDFILE:
+                n = os.sendfile(conn.sock.fileno(), conn.file.fileno(),
+                                conn.file_offset, conn.file_left)
+            else:
+                conn.file.seek(conn.file_offset)
+                n = conn.sock.send(conn.file.read(min(conn.file_left, 65536)))
+            if n == 0:
+                raise OSError("{} shrank while being sent".format(conn.segment.path))
+            conn.file_offset += n
+            conn.file_left -= n
+        conn.file.close()
+        conn.file = None
+        conn.segment = None
+
+    def _drain_done(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        while self._done:
+            conn, response = self._done.popleft()
+            self._respond(conn, response)
+
+    # ------------------ Request processing ------------------
+    def _process(self, conn, head, body):
+        adapter = conn.adapter
+        try:
+            req = adapter.prepare_request(head, self.routes, body)
+        except Exception as e:
+            log.warning("Request read error from %s: %s", conn.addr, e)
+            adapter.keep_alive = False
+            self._respond(conn, adapter.build_error(400, "Bad Request", str(e)))
+            return
+
+        if req.hook:
+            self._offload(conn, req, adapter.run_hook)
+        elif PROFILER.owns(req.path) or MEMORY.owns(req.path):
+            # Profile downloads and tracemalloc snapshots block for a while
+            self._offload(conn, req, adapter.dispatch)
+        else:
+            self._finish(conn, req, self._build(conn, req, adapter.dispatch))
+
+    def _offload(self, conn, req, handler):
+        """Builds the response of ``req`` with ``handler`` on the worker pool,
+        or answers 503 when the pool is full."""
+        if not self.pool.submit(self._run_handler, conn, req, handler):
+            conn.adapter.keep_alive = False
+            self._finish(conn, req, render_template("service_unavailable"))
+
+    def _build(self, conn, req, handler):
+        """Calls ``handler(req)``; an unexpected error is answered with 500
+        and closes this connection only, never the reactor loop."""
+        try:
+            return handler(req)
+        except Exception as e:
+            log.error("Request handling error from %s: %s", conn.addr, e)
+            conn.adapter.keep_alive = False
+            return conn.adapter.build_error(500, "Internal Server Error", str(e))
+
+    def _finish(self, conn, req, response):
+        conn.adapter.record_response(req, response)
+        self._respond(conn, response)
+
+    def _run_handler(self, conn, req, handler):
+        """Runs on a worker thread; queues the response for the reactor."""
+        response = self._build(conn, req, handler)
+        conn.adapter.record_response(req, response)
+        self._done.append((conn, response))
+        try:
+            self._wake_w.send(b"\0")
+        except BlockingIOError:
+            # The wake-up socket is already full, the reactor will wake anyway
+            pass
+
+    def _respond(self, conn, response):
+        queue_parts(conn.pending, response)
+        # Optimistic write: most responses fit in the socket buffer, the
+        # rest is flushed when the selector reports the socket writable.
+        self._on_writable(conn)
+
+    def _watch(self, conn, events):
+        """Switches the selector interest of ``conn`` to ``events`` (0 = none)."""
+        if conn.events == events:
+            return
+        if conn.events == 0:
+            self.selector.register(conn.sock, events, conn)
+        elif events == 0:
+            self.selector.unregister(conn.sock)
+        else:
+            self.selector.modify(conn.sock, events, conn)
+        conn.events = events
+
+    def _sweep_idle(self, now):
+        """Closes keep-alive connections idle for longer than KEEPALIVE_TIMEOUT,
+        and connections whose client has not read any of its response for
+        WRITE_TIMEOUT."""
+        for conn in list(self.connections):
+            if conn.events == selectors.EVENT_READ:
+                timeout = KEEPALIVE_TIMEOUT
+            elif conn.events == selectors.EVENT_WRITE:
+                timeout = WRITE_TIMEOUT
+            else:
+                continue
+            if now - conn.last_active > timeout:
+                if conn.events == selectors.EVENT_WRITE:
+                    log.debug("Write timeout for %s", conn.addr)
+                self._close(conn)
+
+    def _close(self, conn):
+        if conn.events:
+            try:
+                self.selector.unregister(conn.sock)
+            except (KeyError, ValueError):
+                pass
+            conn.events = 0
+        if conn in self.connections:
+            self.connections.discard(conn)
+            METRICS.connection_closed()
+        if conn.file is not None:
+            conn.file.close()
+            conn.file = None
+        conn.sock.close()
+
+
+def run_reactor_backend(ip, port, routes, pool_size=DEFAULT_REACTOR_WORKERS,
+                        queue_size=256, reuse_port=False):
+    """
+    Runs the reactor engine until interrupted.
+
+    :param ip (str): IP address to bind the server.
+    :param port (int): Port number to listen on.
+    :param routes (dict): Dictionary of route handlers.
+    :param pool_size (int): Number of worker threads running route hooks.
+    :param queue_size (int): Number of hook calls allowed to wait for a worker.
+    :param reuse_port (bool): bind with ``SO_REUSEPORT`` (prefork workers).
+    """
+    try:
+        Reactor(ip, port, routes, pool_size, queue_size, reuse_port).serve_forever()
+    except socket.error as e:
+        log.error("Socket error: %s", e)
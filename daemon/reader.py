@@ -0,0 +1,212 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.reader
+~~~~~~~~~~~~~~~~~
+
+This module provides an incremental HTTP request reader. Bytes are received
+with ``recv_into`` straight into a preallocated ``bytearray``; the header
+terminator is searched only in newly received bytes, the Content-Length is
+parsed once per request, and the header block and body are handed back as
+``memoryview`` slices of the buffer instead of copies.
+
+The reader does not own a socket. :meth:`RequestReader.fill` receives once
+into the buffer and :meth:`RequestReader.next_request` extracts a complete
+request when there is one, so the same object serves blocking sockets
+(:meth:`RequestReader.read_request`) and the non-blocking reactor.
+
+Usage Example:
+--------------
+>>> reader = RequestReader()
+>>> head, body = reader.read_request(conn)
+>>> request_line = bytes(head).split(b"\r\n", 1)[0]
+
+"""
+
+import re
+
+#: Initial size of the receive buffer; a request header must fit in it.
+DEFAULT_BUFFER_SIZE = 16384
+#: Largest accepted header block, answered with 431 beyond it.
+MAX_HEADER_SIZE = 16384
+#: Largest accepted request body, answered with 413 beyond it.
+MAX_BODY_SIZE = 10 * 1024 * 1024
+
+_TERMINATOR = b"\r\n\r\n"
+_CONTENT_LENGTH = re.compile(rb"\r\ncontent-length[ \t]*:[ \t]*([^\r]*)", re.IGNORECASE)
+
+
+class RequestError(ValueError):
+    """A request that cannot be read; carries the HTTP status to answer with."""
+
+    def __init__(self, code, reason, message):
+        super().__init__(message)
+        self.code = code
+        self.reason = reason
+
+
+def content_length(head, start=0, end=None, max_body_size=MAX_BODY_SIZE):
+    """
+    Returns the body length announced in the header block ``head[start:end]``,
+    0 without a Content-Length.
+
+    :raises RequestError: 400 for a repeated, non-numeric or negative
+                          Content-Length, 413 beyond ``max_body_size``.
+    """
+    matches = _CONTENT_LENGTH.finditer(head, start, len(head) if end is None else end)
+    values = [match.group(1).strip() for match in matches]
+    if not values:
+        return 0
+    if len(values) > 1 or not values[0].isdigit():
+        raise RequestError(400, "Bad Request", "Invalid Content-Length")
+    length = int(values[0])
+    if length > max_body_size:
+        raise RequestError(413, "Payload Too Large",
+                           "Request body exceeds {} bytes".format(max_body_size))
+    return length
+
+
+class RequestReader:
+    """The :class:`RequestReader <RequestReader>` object buffers the bytes of
+    one connection and splits them into requests.
+
+    The ``memoryview`` slices returned by :meth:`next_request` point into the
+    internal buffer: they stay valid until the next call to :meth:`fill` or
+    :meth:`next_request`. Copy them (``bytes(view)``) to keep them longer.
+
+    :attrs max_header_size (int): header block limit in bytes.
+    :attrs max_body_size (int): body limit in bytes.
+    """
+
+    __slots__ = ("max_header_size", "max_body_size", "_buf", "_start", "_end",
+                 "_scanned", "_head_end", "_body_len")
+
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE,
+                 max_header_size=MAX_HEADER_SIZE, max_body_size=MAX_BODY_SIZE):
+        self.max_header_size = max_header_size
+        self.max_body_size = max_body_size
+        self._buf = bytearray(buffer_size)
+        #: unread bytes live in _buf[_start:_end]
+        self._start = 0
+        self._end = 0
+        #: position up to which the header terminator was searched
+        self._scanned = 0
+        #: index of the header terminator of the pending request, or -1
+        self._head_end = -1
+        self._body_len = 0
+
+    def buffered(self):
+        """Number of received bytes not yet returned as a request."""
+        return self._end - self._start
+
+    def fill(self, sock):
+        """
+        Receives once from ``sock`` into the free tail of the buffer.
+
+        :param sock (socket.socket): connection to read from.
+
+        :rtype int: number of bytes received, 0 on EOF.
+        :raises BlockingIOError: on a non-blocking socket with nothing to read.
+        """
+        if self._end == len(self._buf):
+            self._reserve(self._end - self._start + 1)
+        with memoryview(self._buf) as view:
+            n = sock.recv_into(view[self._end:])
+        self._end += n
+        return n
+
+    def next_request(self):
+        """
+        Extracts the next complete request from the buffered bytes.
+
+        :rtype tuple: ``(head, body)`` memoryviews, ``head`` being the request
+                      line and headers without the blank line, or ``None`` if
+                      more bytes are needed.
+        :raises RequestError: header or body over the limits, or an invalid
+                              Content-Length.
+        """
+        buf = self._buf
+        start, end = self._start, self._end
+
+        if self._head_end < 0:
+            idx = buf.find(_TERMINATOR, max(start, self._scanned - 3), end)
+            if idx < 0:
+                self._scanned = end
+                if end - start > self.max_header_size:
+                    raise RequestError(431, "Request Header Fields Too Large",
+                                       "Request header exceeds {} bytes".format(self.max_header_size))
+                return None
+            if idx - start > self.max_header_size:
+                raise RequestError(431, "Request Header Fields Too Large",
+                                   "Request header exceeds {} bytes".format(self.max_header_size))
+            self._head_end = idx
+            self._body_len = self._parse_content_length(start, idx)
+
+        body_start = self._head_end + 4
+        total_end = body_start + self._body_len
+        if total_end > end:
+            # Make room for the whole body so it arrives in one piece
+            self._reserve(total_end - start)
+            return None
+
+        view = memoryview(buf)
+        head = view[start:self._head_end]
+        body = view[body_start:total_end]
+
+        if total_end == end:
+            # Nothing pipelined behind this request: rewind for free
+            self._start = self._end = self._scanned = 0
+        else:
+            self._start = self._scanned = total_end
+        self._head_end = -1
+        self._body_len = 0
+        return head, body
+
+    def read_request(self, sock):
+        """
+        Blocks until a complete request was received on ``sock``.
+
+        :param sock (socket.socket): connection to read from.
+
+        :rtype tuple: ``(head, body)`` memoryviews, or ``None`` if the peer
+                      closed the connection before a complete request.
+        :raises RequestError: see :meth:`next_request`.
+        """
+        while True:
+            parts = self.next_request()
+            if parts is not None:
+                return parts
+            if self.fill(sock) == 0:
+                return None
+
+    def _parse_content_length(self, start, head_end):
+        return content_length(self._buf, start, head_end, self.max_body_size)
+
+    def _reserve(self, needed):
+        """Ensures ``needed`` bytes fit in the buffer from the unread start,
+        compacting or growing it. Existing views keep the old contents only
+        when the buffer grows; compaction overwrites them."""
+        start, end = self._start, self._end
+        if len(self._buf) - start >= needed:
+            return
+        if needed <= len(self._buf):
+            self._buf[0:end - start] = self._buf[start:end]
+        else:
+            grown = bytearray(max(needed, 2 * len(self._buf)))
+            grown[0:end - start] = self._buf[start:end]
+            self._buf = grown
+        self._end = end - start
+        self._scanned = max(self._scanned - start, 0)
+        if self._head_end >= 0:
+            self._head_end -= start
+        self._start = 0
@@ -0,0 +1,151 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.reply
+~~~~~~~~~~~~~~~~~
+
+This module provides what a route hook may return and how it is encoded.
+
+A hook returns either a body or a :class:`Reply <Reply>` carrying a status,
+extra headers and a body. Bodies are encoded by type:
+
+- :class:`RawJSON <RawJSON>`: bytes already holding a JSON document, sent
+  as ``application/json`` without any copy;
+- ``bytes``: sent as is, ``application/octet-stream`` unless the reply says
+  otherwise;
+- ``dict`` / ``list``: ``json.dumps``, ``application/json``;
+- ``str``: UTF-8, ``text/plain``.
+
+Guessing the type of a ``str`` from its first character (``{`` or ``[`` for
+JSON, ``<`` for HTML) is the legacy behaviour; it is opt-in, with
+``WeApRous(sniff_strings=True)`` or ``@app.route(..., sniff=True)``.
+
+Usage Example:
+--------------
+>>> @app.route('/get-list', methods=['GET'])
+>>> def get_list(headers, body):
+>>>     return RawJSON.dumps({'peers': peers})
+>>> @app.route('/peer/<int:id>', methods=['DELETE'])
+>>> def drop(headers, body, id):
+>>>     return Reply({'status': 'error'}, status=404)
+"""
+
+import json
+
+from .headers import header_lines
+
+JSON_TYPE = "application/json"
+TEXT_TYPE = "text/plain; charset=utf-8"
+HTML_TYPE = "text/html; charset=utf-8"
+BINARY_TYPE = "application/octet-stream"
+
+#: Body sent when a hook returns ``None``.
+EMPTY_RESULT = {"status": "error", "message": "Empty response"}
+
+
+class RawJSON(bytes):
+    """Bytes holding a serialized JSON document, sent as ``application/json``
+    as they are."""
+
+    __slots__ = ()
+
+    @classmethod
+    def dumps(cls, value):
+        """Serializes ``value`` once, e.g. to keep a cached reply."""
+        return cls(json.dumps(value).encode("utf-8"))
+
+
+class Reply:
+    """The :class:`Reply <Reply>` object is the full result of a hook.
+
+    :attrs body: ``RawJSON``, ``bytes``, ``str``, ``dict`` or ``list``.
+    :attrs status (int): status code.
+    :attrs headers (dict): extra response headers, a :class:`Headers <Headers>`
+                           to repeat a field such as ``Set-Cookie``.
+    :attrs content_type (str): overrides the type derived from the body.
+    :attrs reason (str): non-standard reason phrase.
+    """
+
+    __slots__ = ("body", "status", "headers", "content_type", "reason")
+
+    def __init__(self, body=b"", status=200, headers=None, content_type=None, reason=None):
+        self.body = body
+        self.status = status
+        self.headers = headers
+        self.content_type = content_type
+        self.reason = reason
+
+
+def sniff_type(text):
+    """Legacy guess of the content type of a ``str`` result."""
+    head = text.lstrip()[:1]
+    if head in ("{", "["):
+        return JSON_TYPE
+    if head == "<":
+        return HTML_TYPE
+    return TEXT_TYPE
+
+
+def _encode_str(body, sniff):
+    return (sniff_type(body) if sniff else TEXT_TYPE), body.encode("utf-8")
+
+
+def _encode_json(body, sniff):
+    return JSON_TYPE, json.dumps(body).encode("utf-8")
+
+
+#: Encoders by exact body type; subclasses go through :func:`encode_body`.
+_ENCODERS = {
+    RawJSON: lambda body, sniff: (JSON_TYPE, body),
+    bytes: lambda body, sniff: (BINARY_TYPE, body),
+    str: _encode_str,
+    dict: _encode_json,
+    list: _encode_json,
+}
+
+
+def encode_body(body, sniff=False):
+    """
+    Encodes a hook body.
+
+    :param body: see :class:`Reply <Reply>`; ``None`` is :data:`EMPTY_RESULT`.
+    :param sniff (bool): guess the type of ``str`` bodies.
+
+    :rtype tuple: ``(content_type, bytes)``.
+    """
+    encoder = _ENCODERS.get(type(body))
+    if encoder is not None:
+        return encoder(body, sniff)
+    if body is None:
+        return _encode_json(EMPTY_RESULT, sniff)
+    if isinstance(body, RawJSON):
+        return JSON_TYPE, bytes(body)
+    if isinstance(body, (bytes, bytearray, memoryview)):
+        return BINARY_TYPE, bytes(body)
+    if isinstance(body, str):
+        return _encode_str(body, sniff)
+    return _encode_json(body, sniff)
+
+
+def encode_result(result, sniff=False):
+    """
+    Encodes whatever a hook returned.
+
+    :rtype tuple: ``(status, reason, content_type, extra header lines, body)``.
+    """
+    if not isinstance(result, Reply):
+        content_type, body = encode_body(result, sniff)
+        return 200, None, content_type, b"", body
+    content_type, body = encode_body(result.body, sniff)
+    return (result.status, result.reason, result.content_type or content_type,
+            header_lines(result.headers), body)
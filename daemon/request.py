@@ -16,9 +16,35 @@ daemon.request
 
 This module provides a Request object to manage and persist 
 request settings (cookies, auth, proxies).
+
+Only the request line is parsed by :meth:`Request.prepare`; everything else
+is computed on first access and cached, so a request answered from the path
+alone (a template 401, a static file, a 404) never pays for it:
+
+- :attr:`Request.headers`: the :class:`Headers <Headers>` of the header lines;
+  :meth:`Request.header` answers the first lookup by scanning for that one
+  name, and builds :attr:`Request.headers` for the next ones;
+- :attr:`Request.cookies`: the ``Cookie`` header as a dict;
+- :attr:`Request.query`: the query string split off :attr:`Request.path`;
+- :attr:`Request.text`, :meth:`Request.json` and :meth:`Request.form`: the
+  body, kept as the raw bytes received.
+
+Hooks declaring a ``request`` parameter get the :class:`Request <Request>`
+itself, e.g. ``request.json()`` instead of ``json.loads(body)``.
 """
-from .dictionary import CaseInsensitiveDict
+import json
+from urllib.parse import parse_qs, parse_qsl
+
+from .dictionary import Headers
+from .router import Router
+from .logger import get_logger
+from .session import parse_cookies
 from .utils import get_auth_from_url
+
+_UNSET = object()
+
+log = get_logger("Request")
+
 class Request():
     """The fully mutable "class" `Request <Request>` object,
     containing the exact bytes that will be sent to the server.
@@ -51,20 +77,32 @@ class Request():
     def __init__(self):
         #: HTTP verb to send to the server.
         self.method = None
-        #: HTTP URL to send the request to.
+        #: Request target as received, query string included.
         self.url = None
-        #: dictionary of HTTP headers.
-        self.headers = None
-        #: HTTP path
-        self.path = None        
-        # The cookies set used to create Cookie header
-        self.cookies = None
-        #: request body to send to the server.
+        #: HTTP path, without the query string
+        self.path = None
+        #: Query string of :attr:`url`, without ``?``
+        self.query_string = ""
+        #: Header lines, parsed into :attr:`headers` on first access
+        self._lines = None
+        self._scanned = False
+        self._headers = None
+        self._cookies = None
+        self._query = None
+        #: request body, raw bytes as received.
         self.body = None
+        #: Lazily decoded views of the body
+        self._text = None
+        self._json = _UNSET
+        self._form = None
         #: Routes
         self.routes = {}
         #: Hook point for routed mapped-path
         self.hook = None
+        #: Path parameters captured by the route, passed to the hook
+        self.params = {}
+        #: Methods of the matched path when ``method`` had no hook (405)
+        self.allowed = ()
 
     def extract_request_line(self, request):
         try:
@@ -73,50 +111,150 @@ class Request():
             method, path, version = first_line.split()
             return method.strip(), path.strip(), version.strip()
         except Exception:
-            print("[Request] Invalid request line:", request)
+            log.warning("Invalid request line: %r", request)
             return None, None, None
              
     def prepare_headers(self, request):
-        """Prepares the given HTTP headers."""
-        lines = request.split('\r\n')
-        headers = CaseInsensitiveDict()
+        """Prepares the given HTTP headers from the header block, or from its
+        lines when already split."""
+        lines = request.split('\r\n') if isinstance(request, str) else request
+        pairs = []
         for line in lines[1:]:
-            if ': ' in line:
-                key, val = line.split(': ', 1)
-                headers[key.lower()] = val
-        return headers
+            key, sep, val = line.partition(':')
+            if sep:
+                pairs.append((key.strip(), val.strip()))
+        return Headers(pairs)
+
+    def prepare(self, request, routes=None, body=None):
+        """Prepares the entire request with the given parameters.
+
+        :param request (bytes): the raw message, or only its header block
+                                when ``body`` is given. ``str`` is accepted
+                                for backward compatibility.
+        :param routes (dict): route table used to find the hook.
+        :param body (bytes): the raw body, already split from the header.
+        """
+        if body is None:
+            if isinstance(request, str):
+                request = request.encode('utf-8')
+            head, _, body = bytes(request).partition(b'\r\n\r\n')
+        else:
+            head = request
 
-    def prepare(self, request, routes=None):
-        """Prepares the entire request with the given parameters."""
-        # Prepare the request line from the request header
-        self.method, self.path, self.version = self.extract_request_line(request)
-        print("[Request] {} path {} version {}".format(self.method, self.path, self.version))
+        # Header bytes are ISO-8859-1 per HTTP; decoding them never fails.
+        # Only the request line is parsed here, the header lines on demand.
+        lines = str(head, 'latin-1').split('\r\n')
+        self.method, self.url, self.version = self.extract_request_line(lines[0])
+        self.path, self.query_string = None, ""
+        if self.url is not None:
+            self.path, _, self.query_string = self.url.partition("?")
+        log.debug("%s path %s version %s", self.method, self.path, self.version)
+        self._lines = lines
+        self._scanned = False
+        self._headers = None
+        self._cookies = None
+        self._query = None
 
         #
         # @bksysnet Preapring the webapp hook with WeApRous instance
         # The default behaviour with HTTP server is empty routed
         #
-        # TODO manage the webapp hook in this mounting point
-        self.headers = self.prepare_headers(request)
-        #Parse header
-        self.prepare_cookies_from_header()
-
         #Parse routes and hook (for webapp)
+        self.params = {}
+        self.allowed = ()
         if routes:
             self.routes = routes
-            self.hook = routes.get((self.method, self.path))
+            if isinstance(routes, Router):
+                self.hook, self.params, self.allowed = routes.match(self.method, self.path or "")
+            else:
+                self.hook = routes.get((self.method, self.path))
             if self.hook:
-                print(f"[Request] Hook found for {self.path}")
-
-        #Parse body (after blank line)
-        body_split = request.split('\r\n\r\n', 1)
-        self.body = body_split[1] if len(body_split) > 1 else ""
+                log.debug("Hook found for %s", self.path)
 
-        #Ensure Content-Length header
-        self.prepare_content_length(self.body)
+        #Body stays raw bytes; text/json/form decode it on first use
+        self.body = body if isinstance(body, bytes) else bytes(body)
+        self._text = None
+        self._json = _UNSET
+        self._form = None
 
         return self
 
+    @property
+    def headers(self):
+        """The request headers, parsed from the header lines on first access.
+        ``Content-Length`` is the length of the body."""
+        if self._headers is None and self._lines is not None:
+            self._headers = self.prepare_headers(self._lines)
+            self.prepare_content_length(self.body or b"")
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers):
+        self._headers = headers
+
+    def header(self, name, default=None):
+        """
+        Returns the value of header ``name``. The first lookup of a request
+        scans the header lines for that name only, which is all keep-alive
+        needs; any further one builds :attr:`headers` once and reads it.
+
+        :param name (str): header name, any case.
+        """
+        if self._headers is None and self._lines is not None and not self._scanned:
+            self._scanned = True
+            name = name.lower()
+            value = default
+            for line in self._lines[1:]:
+                key, sep, val = line.partition(':')
+                if sep and key.strip().lower() == name:
+                    value = val.strip()
+            return value
+        headers = self.headers
+        return default if headers is None else headers.get(name, default)
+
+    @property
+    def cookies(self):
+        """The ``Cookie`` header as a ``name -> value`` dict, cached."""
+        if self._cookies is None:
+            self._cookies = parse_cookies(self.header('cookie'))
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, cookies):
+        self._cookies = cookies
+
+    @property
+    def query(self):
+        """The query string as a ``name -> [values]`` dict, cached."""
+        if self._query is None:
+            self._query = parse_qs(self.query_string, keep_blank_values=True)
+        return self._query
+
+    @property
+    def text(self):
+        """The body decoded as UTF-8 (invalid bytes replaced), cached."""
+        if self._text is None:
+            body = self.body or b""
+            self._text = body if isinstance(body, str) else body.decode('utf-8', 'replace')
+        return self._text
+
+    def json(self):
+        """The body parsed as JSON, cached after the first call; ``{}`` for an
+        empty body, so handlers can call ``.get`` on it.
+
+        :raises ValueError: if the body is not valid JSON.
+        """
+        if self._json is _UNSET:
+            self._json = json.loads(self.body) if self.body else {}
+        return self._json
+
+    def form(self):
+        """The body parsed as ``application/x-www-form-urlencoded`` into a
+        dict (last value wins for repeated keys), cached."""
+        if self._form is None:
+            self._form = dict(parse_qsl(self.text, keep_blank_values=True))
+        return self._form
+
     def prepare_body(self, data, files, json=None):
         if json is not None:
             try:
@@ -143,8 +281,8 @@ class Request():
         #
 	# self.auth = ...
         if self.headers is None:
-            self.headers = CaseInsensitiveDict()
-        length = len(body.encode('utf-8') if isinstance(body, str) else body)
+            self.headers = Headers()
+        length = len(body) if isinstance(body, (bytes, bytearray)) else len(body.encode('utf-8'))
         self.headers["Content-Length"] = str(length)
         return
 
@@ -162,15 +300,10 @@ class Request():
         if cookies and isinstance(cookies, dict):
             cookie_str = '; '.join(f"{k}={v}" for k, v in cookies.items())
             if not self.headers:
-                self.headers = CaseInsensitiveDict()
+                self.headers = Headers()
             self.headers["cookie"] = cookie_str
         return
 
     def prepare_cookies_from_header(self):
         """Parse cookies from 'cookie' header."""
-        self.cookies = {}
-        cookie_header = self.headers.get('cookie', '')
-        for pair in cookie_header.split(';'):
-            if '=' in pair:
-                key, value = pair.strip().split('=', 1)
-                self.cookies[key] = value
\ No newline at end of file
+        self.cookies = parse_cookies(self.headers.get('cookie', ''))
\ No newline at end of file
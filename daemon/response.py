@@ -24,9 +24,30 @@ import datetime
 import os
 import mimetypes
 from .dictionary import CaseInsensitiveDict
+from .static import (ASSET_CACHE, RangeNotSatisfiable, is_not_modified,
+                     join_response, partial_response, range_not_satisfiable, resolve_path,
+                     select_ranges, select_variant)
+from .logger import get_logger
+from .headers import CRLF, date_line, header_lines, status_line
+
+log = get_logger("Response")
 
 BASE_DIR = ""
 
+#: Headers of static responses after the cached asset header.
+CACHE_LINES = b"Cache-Control: no-cache\r\nPragma: no-cache\r\n"
+#: The legacy 404 response, serialized once.
+NOT_FOUND_RESPONSE = (
+    b"HTTP/1.1 404 Not Found\r\n"
+    b"Accept-Ranges: bytes\r\n"
+    b"Content-Type: text/html\r\n"
+    b"Content-Length: 13\r\n"
+    b"Cache-Control: max-age=86000\r\n"
+    b"Connection: close\r\n"
+    b"\r\n"
+    b"404 Not Found"
+)
+
 class Response():   
     """The :class:`Response <Response>` object, which contains a
     server's response to an HTTP request.
@@ -85,6 +106,8 @@ class Response():
 
         self._content = False
         self._content_consumed = False
+        #: :class:`StaticAsset <StaticAsset>` loaded by :meth:`build_content`.
+        self._asset = None
         self._next = None
 
         #: Integer Code of responded HTTP Status, e.g. 404 or 200.
@@ -151,7 +174,7 @@ class Response():
 
         # Processing mime_type based on main_type and sub_type
         main_type, sub_type = mime_type.split('/', 1)
-        print("[Response] processing MIME main_type={} sub_type={}".format(main_type,sub_type))
+        log.debug("processing MIME main_type=%s sub_type=%s", main_type, sub_type)
         if main_type == 'text':
             self.headers['Content-Type']=f'text/{sub_type}'
             if sub_type in ('plain', 'css', 'js'):
@@ -194,28 +217,30 @@ class Response():
         :params path (str): relative path to the file.
         :params base_dir (str): base directory where the file is located.
 
-        :rtype tuple: (int, bytes) representing content length and content data.
+        :rtype tuple: (int, bytes | FileSegment) representing content length
+                      and content data; large files are returned as a
+                      :class:`FileSegment <FileSegment>` to be sent with sendfile.
         """
 
-        filepath = os.path.join(base_dir, path.lstrip('/'))
+        filepath = resolve_path(base_dir, path)
 
-        print("[Response] serving the object at location {}".format(filepath))
+        log.debug("serving the object at location %s", filepath)
             #
             #  TODO: implement the step of fetch the object file
             #        store in the return value of content
             #
-        if not os.path.exists(filepath):
-            print("[Response] File not found -> 404")
-            return 0, b"404 Not Found"
         try:
-            # Đọc file nhị phân (cho cả ảnh, CSS, HTML, ...)
-            with open(filepath, "rb") as f:
-                content = f.read()
+            # Đọc file nhị phân (cho cả ảnh, CSS, HTML, ...) qua cache dùng chung
+            asset = ASSET_CACHE.get(filepath) if filepath else None
         except Exception as e:
-            print(f"[Response] Error reading file: {e}")
+            log.error("Error reading file: %s", e)
             return 0, f"Error reading file: {e}".encode("utf-8")
-        
-        return len(content), content
+        if asset is None:
+            log.debug("File not found -> 404")
+            return 0, b"404 Not Found"
+
+        self._asset = asset
+        return asset.size, asset.body
 
 
     def build_response_header(self, request):
@@ -223,49 +248,15 @@ class Response():
         Constructs the HTTP response headers based on the class:`Request <Request>
         and internal attributes.
 
+        The status line, Content-Type, Content-Length, validators and
+        Content-Encoding come pre-serialized with the cached asset, only the
+        ``Date`` line is added per second.
+
         :params request (class:`Request <Request>`): incoming request object.
 
         :rtypes bytes: encoded HTTP response header.
         """
-        reqhdr = request.headers
-        rsphdr = self.headers
-
-        #Build dynamic headers
-        headers = {
-                "Accept": "{}".format(reqhdr.get("Accept", "application/json")),
-                "Accept-Language": "{}".format(reqhdr.get("Accept-Language", "en-US,en;q=0.9")),
-                "Authorization": "{}".format(reqhdr.get("Authorization", "Basic <credentials>")),
-                "Cache-Control": "no-cache",
-                "Content-Type": "{}".format(self.headers['Content-Type']),
-                "Content-Length": "{}".format(len(self._content)),
-                "Cookie": "{}".format(reqhdr.get("Cookie", "sessionid=xyz789")), #dummy cookie
-        #
-        # TODO prepare the request authentication
-        #
-	# self.auth = ...
-                "Date": "{}".format(datetime.datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT")),
-                "Max-Forward": "10",
-                "Pragma": "no-cache",
-                "Proxy-Authorization": "Basic dXNlcjpwYXNz",  # example base64
-                "Warning": "199 Miscellaneous warning",
-                "User-Agent": "{}".format(reqhdr.get("User-Agent", "Chrome/123.0.0.0")),
-            }
-
-        # Header text alignment
-            #
-            #  TODO: implement the header building to create formated
-            #        header from the provied headers
-            #
-        #
-        # TODO prepare the request authentication
-        #
-	# self.auth = ...
-        # Ghép header thành dạng HTTP chuẩn
-        fmt_header = "HTTP/1.1 200 OK\r\n"
-        for key, val in headers.items():
-            fmt_header += f"{key}: {val}\r\n"
-        fmt_header += "\r\n"  # kết thúc header    
-        return str(fmt_header).encode('utf-8')
+        return b"".join((self._asset.header, date_line(), CACHE_LINES, CRLF))
 
 
     def build_notfound(self):
@@ -275,16 +266,18 @@ class Response():
         :rtype bytes: Encoded 404 response.
         """
 
-        return (
-                "HTTP/1.1 404 Not Found\r\n"
-                "Accept-Ranges: bytes\r\n"
-                "Content-Type: text/html\r\n"
-                "Content-Length: 13\r\n"
-                "Cache-Control: max-age=86000\r\n"
-                "Connection: close\r\n"
-                "\r\n"
-                "404 Not Found"
-            ).encode('utf-8')
+        return NOT_FOUND_RESPONSE
+
+
+    def build_not_modified(self):
+        """
+        Constructs a bodyless 304 Not Modified response for the loaded asset.
+
+        :rtype bytes: Encoded 304 response.
+        """
+
+        return b"".join((self._asset.not_modified_header, date_line(),
+                         b"Cache-Control: no-cache\r\n", CRLF))
 
 
     def build_response(self, request):
@@ -293,7 +286,10 @@ class Response():
 
         :params request (class:`Request <Request>`): incoming request object.
 
-        :rtype bytes: complete HTTP response using prepared headers and content.
+        :rtype bytes | tuple: complete HTTP response using prepared headers and
+                              content, or ``(header, part, ...)`` for a large
+                              file (see :func:`send_response <send_response>`);
+                              ``Range`` requests get a 206 response.
         """
         #
         # TODO: add support objects
@@ -302,7 +298,7 @@ class Response():
         if path == '/':
            path = '/index.html'
         mime_type = self.get_mime_type(path)
-        print(f"[Response] {request.method} path {request.path} mime_type {mime_type}")
+        log.debug("%s path %s mime_type %s", request.method, request.path, mime_type)
 
         try:
             base_dir = self.prepare_content_type(mime_type)
@@ -314,20 +310,35 @@ class Response():
         if c_len <= 0:
             return self.build_notfound()
 
+        # gzip/deflate variant negotiated with Accept-Encoding
+        asset = self._asset
+        self._asset = select_variant(asset, request.headers)
+        self._content = self._asset.body
+
+        if is_not_modified(self._asset, request.headers):
+            return self.build_not_modified()
+
+        try:
+            ranges = select_ranges(asset, request.headers)
+        except RangeNotSatisfiable:
+            return range_not_satisfiable(asset)
+        if ranges is not None:
+            return partial_response(asset, ranges)
+
         self._header = self.build_response_header(request)
 
-        return self._header + self._content
+        return join_response(self._header, self._content)
     
     def compose(self, status="200 OK", headers=None, body=b""):
         """
         Gộp status line, headers và body thành gói HTTP hoàn chỉnh (dạng bytes)
         """
-        headers = headers or {}
-        header_lines = [f"HTTP/1.1 {status}"]
-        for k, v in headers.items():
-            header_lines.append(f"{k}: {v}")
-        header_lines.append(f"Content-Length: {len(body)}")
-        header_lines.append("")  # dòng trống trước body
-        header_lines.append("")  # đảm bảo 2 \r\n
-        head = "\r\n".join(header_lines).encode("utf-8")
-        return head + body
\ No newline at end of file
+        code, _, reason = status.partition(" ")
+        return b"".join((
+            status_line(int(code), reason),
+            header_lines(headers),
+            b"Content-Length: %d\r\n" % len(body),
+            date_line(),
+            CRLF,
+            body,
+        ))
\ No newline at end of file
@@ -45,4 +45,10 @@ RESPONSE_TEMPLATES = CaseInsensitiveDict({
         "headers": {},
         "body": b"<h1>404 Not Found</h1>",
     },
+    "service_unavailable": {
+        "status": "503 Service Unavailable",
+        "content_type": "text/html; charset=utf-8",
+        "headers": {"Retry-After": "1"},
+        "body": b"<h1>503 Service Unavailable</h1><p>Server is busy, please retry.</p>",
+    },
 })
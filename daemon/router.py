@@ -0,0 +1,232 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.router
+~~~~~~~~~~~~~~~~~
+
+This module provides the route table of WeApRous apps, compiled into a trie
+of path segments so a lookup walks one node per segment of the request path
+whatever the number of routes.
+
+Route patterns are ``/``-separated segments:
+
+- ``channel``: a literal segment.
+- ``<id>`` or ``<str:id>``: one non-empty segment captured as ``id``.
+- ``<int:id>`` / ``<float:x>``: one segment converted to a number; a segment
+  that does not convert does not match.
+- ``<path:rest>`` or ``*``: the remaining segments (possibly none), captured
+  as ``rest`` (unnamed ``*`` is captured as ``path``); only as last segment.
+
+Parameters are passed to the hook as keyword arguments next to ``headers``,
+``body`` and ``request``, so those names are refused in patterns.
+
+At each node literal segments are tried first, then parameters, then the
+wildcard, backtracking when a branch dead-ends deeper down. A route
+registered with method ``*`` answers every method that has no handler of its
+own. When the path matches but the method does not, the allowed methods are
+reported so the adapter can answer 405 with an ``Allow`` header.
+
+The :class:`Router <Router>` is still a ``dict`` keyed by ``(method,
+pattern)``, so code reading the route table keeps working.
+
+Usage Example:
+--------------
+>>> router = Router()
+>>> router[("GET", "/peer/<int:id>")] = get_peer
+>>> router.match("GET", "/peer/42?full=1")
+(<function get_peer>, {'id': 42}, ())
+"""
+
+#: Methods matched by a route registered with method ``*``.
+ANY_METHOD = "*"
+
+#: Names the adapter passes to every hook, refused as parameter names.
+RESERVED_PARAMS = ("headers", "body", "request")
+
+#: Converters for typed parameters: segment -> value, ValueError if invalid.
+CONVERTERS = {
+    "str": str,
+    "int": int,
+    "float": float,
+}
+
+
+class _Node:
+    """One path segment of the trie."""
+
+    __slots__ = ("static", "params", "wildcard", "handlers")
+
+    def __init__(self):
+        #: literal segment -> child node
+        self.static = {}
+        #: ``(converter name, param name, child node)`` in registration order
+        self.params = []
+        #: ``(param name, handlers)`` of a trailing ``<path:...>`` / ``*``
+        self.wildcard = None
+        #: method -> handler for routes ending at this node
+        self.handlers = {}
+
+
+def split_path(path):
+    """Returns the segments of ``path`` without its query string."""
+    path = path.partition("?")[0]
+    return [segment for segment in path.split("/") if segment]
+
+
+def parse_segment(segment):
+    """
+    Classifies one pattern segment.
+
+    :rtype tuple: ``("static", text)``, ``("param", converter, name)`` or
+                  ``("wildcard", name)``.
+    :raises ValueError: unknown converter, malformed parameter, or a name of
+                        :data:`RESERVED_PARAMS`.
+    """
+    if segment == "*":
+        return ("wildcard", "path")
+    if not (segment.startswith("<") and segment.endswith(">")):
+        return ("static", segment)
+    converter, _, name = segment[1:-1].rpartition(":")
+    converter = converter or "str"
+    if not name.isidentifier():
+        raise ValueError("Invalid route parameter {!r}".format(segment))
+    if name in RESERVED_PARAMS:
+        raise ValueError("Route parameter {!r} clashes with a hook argument".format(segment))
+    if converter == "path":
+        return ("wildcard", name)
+    if converter not in CONVERTERS:
+        raise ValueError("Unknown route converter {!r} in {!r}".format(converter, segment))
+    return ("param", converter, name)
+
+
+class Router(dict):
+    """The :class:`Router <Router>` object maps ``(method, pattern)`` to
+    handlers and keeps them compiled into a segment trie.
+    """
+
+    def __init__(self, routes=None):
+        super().__init__()
+        self._root = _Node()
+        if routes:
+            self.update(routes)
+
+    def __setitem__(self, key, handler):
+        method, pattern = key
+        self._add(method.upper(), pattern, handler)
+        super().__setitem__((method.upper(), pattern), handler)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._rebuild()
+
+    def update(self, *args, **kwargs):
+        for key, handler in dict(*args, **kwargs).items():
+            self[key] = handler
+
+    def pop(self, key, *default):
+        value = super().pop(key, *default)
+        self._rebuild()
+        return value
+
+    def clear(self):
+        super().clear()
+        self._root = _Node()
+
+    def _rebuild(self):
+        self._root = _Node()
+        for (method, pattern), handler in self.items():
+            self._add(method, pattern, handler)
+
+    def _add(self, method, pattern, handler):
+        node = self._root
+        segments = split_path(pattern)
+        for index, segment in enumerate(segments):
+            kind = parse_segment(segment)
+            if kind[0] == "static":
+                node = node.static.setdefault(kind[1], _Node())
+            elif kind[0] == "param":
+                for converter, name, child in node.params:
+                    if (converter, name) == kind[1:]:
+                        node = child
+                        break
+                else:
+                    child = _Node()
+                    node.params.append((kind[1], kind[2], child))
+                    node = child
+            else:
+                if index != len(segments) - 1:
+                    raise ValueError("Wildcard must be the last segment of {!r}".format(pattern))
+                if node.wildcard is None:
+                    node.wildcard = (kind[1], {})
+                elif node.wildcard[0] != kind[1]:
+                    raise ValueError("Conflicting wildcard names in {!r}".format(pattern))
+                node.wildcard[1][method] = handler
+                return
+        node.handlers[method] = handler
+
+    def match(self, method, path):
+        """
+        Finds the handler for a request.
+
+        :param method (str): request method.
+        :param path (str): request target; a query string is ignored.
+
+        :rtype tuple: ``(handler, params, allowed)``; ``handler`` is ``None``
+                      when nothing matched, and ``allowed`` then lists the
+                      methods the path supports (empty for an unknown path).
+        """
+        allowed = set()
+        found = self._find(self._root, split_path(path), 0, method, {}, allowed)
+        if found is not None:
+            return found[0], found[1], ()
+        return None, {}, tuple(sorted(allowed))
+
+    def _find(self, node, segments, index, method, params, allowed):
+        if index == len(segments):
+            handler = _pick(node.handlers, method, allowed)
+            if handler is not None:
+                return handler, params
+        else:
+            segment = segments[index]
+            child = node.static.get(segment)
+            if child is not None:
+                found = self._find(child, segments, index + 1, method, params, allowed)
+                if found is not None:
+                    return found
+            for converter, name, child in node.params:
+                try:
+                    value = CONVERTERS[converter](segment)
+                except ValueError:
+                    continue
+                found = self._find(child, segments, index + 1, method,
+                                   dict(params, **{name: value}), allowed)
+                if found is not None:
+                    return found
+
+        if node.wildcard is not None:
+            name, handlers = node.wildcard
+            handler = _pick(handlers, method, allowed)
+            if handler is not None:
+                return handler, dict(params, **{name: "/".join(segments[index:])})
+        return None
+
+
+def _pick(handlers, method, allowed):
+    """Returns the handler of ``method`` (or of ``*``), recording the methods
+    of a path that matched without it."""
+    if not handlers:
+        return None
+    handler = handlers.get(method) or handlers.get(ANY_METHOD)
+    if handler is None:
+        allowed.update(handlers)
+    return handler
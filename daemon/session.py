@@ -0,0 +1,364 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.session
+~~~~~~~~~~~~~~~~~
+
+This module provides the login sessions of the backend daemon.
+
+:class:`SessionStore <SessionStore>` replaces the former ``SESSIONS`` dict
+and ``SESSION_COUNTER``:
+
+- session IDs are 256-bit random tokens from ``secrets``, not guessable
+  counters;
+- entries are spread over ``SHARDS`` shards, each an ``OrderedDict`` with its
+  own lock, so logins and cookie checks on different sessions rarely contend;
+- a session expires after ``idle_ttl`` seconds without a request, and after
+  ``absolute_ttl`` seconds whatever its activity;
+- the store holds at most ``max_sessions`` entries; each shard evicts its
+  least recently used session when full;
+- there is no sweeper thread: expired entries are dropped when looked up,
+  and each :meth:`SessionStore.create` sweeps its shard when that shard was
+  not swept for ``SWEEP_INTERVAL`` seconds.
+
+Those sessions are per process: with prefork workers or several backends
+behind the proxy a session is only known to the process that created it.
+:class:`SignedSessions <SignedSessions>` is the stateless alternative: the
+cookie is a token ``v1.<payload>.<signature>`` where the payload is the
+session data and its expiry time in base64url JSON, signed with HMAC-SHA256.
+Every process holding the key verifies it without any lookup. Such a
+session cannot be revoked before it expires and has no idle TTL. Several
+keys can be given to rotate them: the first one signs, all of them verify.
+
+:func:`use_signed_sessions` switches the process to signed tokens;
+:func:`create_backend <create_backend>` does it when given a
+``session_key`` or when ``WEAPROUS_SESSION_KEY`` is set. Use the same key
+on every backend sharing a host name.
+
+Usage Example:
+--------------
+>>> session_id = get_sessions().create({"username": "admin"})
+>>> get_sessions().get(session_id).data
+{'username': 'admin'}
+>>> use_signed_sessions(load_session_key("config/session.key"))
+"""
+
+import base64
+import collections
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+
+#: Name of the cookie carrying the session ID.
+SESSION_COOKIE = "session_id"
+#: Seconds a session survives without requests.
+DEFAULT_IDLE_TTL = 30 * 60
+#: Seconds a session survives at most.
+DEFAULT_ABSOLUTE_TTL = 12 * 3600
+#: Sessions kept before the least recently used ones are evicted.
+DEFAULT_MAX_SESSIONS = 100000
+#: Independently locked shards of a store.
+SHARDS = 16
+#: Seconds between two sweeps of a shard, run by :meth:`SessionStore.create`.
+SWEEP_INTERVAL = 60.0
+#: Shortest HMAC key accepted for signed sessions, in bytes.
+MIN_KEY_BYTES = 16
+#: Environment variable holding the key of signed sessions.
+SESSION_KEY_ENV = "WEAPROUS_SESSION_KEY"
+
+
+class Session:
+    """One login session.
+
+    :attrs id (str): random token sent in the cookie.
+    :attrs data (dict): what the login stored, e.g. the user name.
+    :attrs created (float): creation time, monotonic in a
+                            :class:`SessionStore`, epoch in a signed token.
+    :attrs last_seen (float): time of the last lookup, same clock.
+    """
+
+    __slots__ = ("id", "data", "created", "last_seen")
+
+    def __init__(self, session_id, data, now):
+        self.id = session_id
+        self.data = data
+        self.created = now
+        self.last_seen = now
+
+
+class _Shard:
+    __slots__ = ("entries", "lock", "swept", "expired", "evicted")
+
+    def __init__(self):
+        #: session id -> Session, least recently used first
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.swept = time.monotonic()
+        self.expired = 0
+        self.evicted = 0
+
+
+class SessionStore:
+    """The :class:`SessionStore <SessionStore>` object keeps the sessions of
+    the process, see the module documentation.
+
+    :attrs idle_ttl (float): seconds a session survives without requests.
+    :attrs absolute_ttl (float): seconds a session survives at most.
+    :attrs max_sessions (int): capacity, enforced per shard.
+    """
+
+    def __init__(self, idle_ttl=DEFAULT_IDLE_TTL, absolute_ttl=DEFAULT_ABSOLUTE_TTL,
+                 max_sessions=DEFAULT_MAX_SESSIONS, shards=SHARDS):
+        self.idle_ttl = idle_ttl
+        self.absolute_ttl = absolute_ttl
+        self.max_sessions = max_sessions
+        self._shards = [_Shard() for _ in range(shards)]
+
+    def _shard(self, session_id):
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    def _expired(self, session, now):
+        return (now - session.last_seen > self.idle_ttl
+                or now - session.created > self.absolute_ttl)
+
+    def create(self, data=None):
+        """
+        Starts a session.
+
+        :param data (dict): values kept with the session.
+
+        :rtype str: the new session ID.
+        """
+        session_id = secrets.token_urlsafe(32)
+        now = time.monotonic()
+        shard = self._shard(session_id)
+        capacity = max(1, -(-self.max_sessions // len(self._shards)))
+        with shard.lock:
+            if now - shard.swept >= SWEEP_INTERVAL:
+                self._sweep(shard, now)
+            shard.entries[session_id] = Session(session_id, dict(data or {}), now)
+            while len(shard.entries) > capacity:
+                shard.entries.popitem(last=False)
+                shard.evicted += 1
+        return session_id
+
+    def get(self, session_id):
+        """
+        Returns the live session ``session_id`` and marks it as used.
+
+        :rtype Session: the session, ``None`` if unknown or expired.
+        """
+        if not session_id:
+            return None
+        now = time.monotonic()
+        shard = self._shard(session_id)
+        with shard.lock:
+            session = shard.entries.get(session_id)
+            if session is None:
+                return None
+            if self._expired(session, now):
+                del shard.entries[session_id]
+                shard.expired += 1
+                return None
+            session.last_seen = now
+            shard.entries.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id):
+        """Ends a session (logout); unknown IDs are ignored."""
+        if not session_id:
+            return
+        shard = self._shard(session_id)
+        with shard.lock:
+            shard.entries.pop(session_id, None)
+
+    def sweep(self):
+        """Drops every expired session and returns how many were dropped."""
+        now = time.monotonic()
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                removed += self._sweep(shard, now)
+        return removed
+
+    def _sweep(self, shard, now):
+        """Drops the expired sessions of ``shard``; the caller holds its lock."""
+        stale = [session_id for session_id, session in shard.entries.items()
+                 if self._expired(session, now)]
+        for session_id in stale:
+            del shard.entries[session_id]
+        shard.swept = now
+        shard.expired += len(stale)
+        return len(stale)
+
+    def clear(self):
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+
+    def __len__(self):
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+    def stats(self):
+        """Returns the size and the eviction counters of the store."""
+        return {
+            "sessions": len(self),
+            "expired": sum(shard.expired for shard in self._shards),
+            "evicted": sum(shard.evicted for shard in self._shards),
+        }
+
+
+class SignedSessions:
+    """The :class:`SignedSessions <SignedSessions>` object issues and
+    verifies HMAC-signed session tokens; it keeps no state, so it has the
+    interface of :class:`SessionStore <SessionStore>` without the storage.
+
+    :attrs ttl (float): seconds a token is valid.
+    """
+
+    def __init__(self, keys, ttl=DEFAULT_ABSOLUTE_TTL):
+        if isinstance(keys, (str, bytes)):
+            keys = [keys]
+        self._keys = [key.encode("utf-8") if isinstance(key, str) else bytes(key)
+                      for key in keys]
+        if not self._keys or any(len(key) < MIN_KEY_BYTES for key in self._keys):
+            raise ValueError("Session keys need at least {} bytes".format(MIN_KEY_BYTES))
+        self.ttl = ttl
+
+    @property
+    def absolute_ttl(self):
+        return self.ttl
+
+    def _sign(self, key, payload):
+        return _b64encode(hmac.new(key, b"v1." + payload, hashlib.sha256).digest())
+
+    def create(self, data=None):
+        """
+        Issues a token holding ``data``.
+
+        :rtype str: the token to send as session cookie.
+        """
+        now = int(time.time())
+        claims = {"d": dict(data or {}), "iat": now, "exp": now + int(self.ttl)}
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        return "v1.{}.{}".format(payload.decode("ascii"),
+                                 self._sign(self._keys[0], payload).decode("ascii"))
+
+    def get(self, token):
+        """
+        Verifies ``token``.
+
+        :rtype Session: the session it carries, ``None`` if the token is
+                        malformed, forged or expired.
+        """
+        if not token:
+            return None
+        version, _, rest = token.partition(".")
+        payload, _, signature = rest.partition(".")
+        if version != "v1" or not payload or not signature:
+            return None
+        payload = payload.encode("ascii", "replace")
+        signature = signature.encode("ascii", "replace")
+        if not any(hmac.compare_digest(self._sign(key, payload), signature)
+                   for key in self._keys):
+            return None
+        try:
+            claims = json.loads(_b64decode(payload))
+            expires, issued, data = claims["exp"], claims["iat"], claims["d"]
+        except (ValueError, KeyError, TypeError):
+            return None
+        now = time.time()
+        if now >= expires:
+            return None
+        session = Session(token, data, issued)
+        session.last_seen = now
+        return session
+
+    def delete(self, token):
+        """Tokens cannot be revoked: the client drops the cookie."""
+
+    def sweep(self):
+        return 0
+
+    def __len__(self):
+        return 0
+
+    def __contains__(self, token):
+        return self.get(token) is not None
+
+    def stats(self):
+        return {"sessions": 0, "expired": 0, "evicted": 0}
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + b"=" * (-len(text) % 4))
+
+
+def load_session_key(path):
+    """Returns the key stored in the file ``path``, surrounding whitespace
+    removed; ``openssl rand -hex 32 > config/session.key`` makes one."""
+    with open(path, "rb") as f:
+        return f.read().strip()
+
+
+def parse_cookies(header):
+    """Returns the ``name -> value`` pairs of a ``Cookie`` header."""
+    cookies = {}
+    for pair in (header or "").split(";"):
+        name, sep, value = pair.strip().partition("=")
+        if sep and name:
+            cookies.setdefault(name, value.strip().strip('"'))
+    return cookies
+
+
+#: Login sessions of the process, see :func:`get_sessions`.
+SESSIONS = SessionStore()
+_active = SESSIONS
+
+
+def get_sessions():
+    """Returns the sessions in use: :data:`SESSIONS`, or the
+    :class:`SignedSessions <SignedSessions>` installed by
+    :func:`use_signed_sessions`."""
+    return _active
+
+
+def use_signed_sessions(keys=None, ttl=DEFAULT_ABSOLUTE_TTL):
+    """
+    Switches the process to stateless signed session cookies.
+
+    :param keys (str | bytes | list): signing key, or keys with the current
+                                      one first; ``WEAPROUS_SESSION_KEY`` if
+                                      ``None``.
+    :param ttl (float): seconds a token is valid.
+
+    :raises ValueError: no key, or a key shorter than ``MIN_KEY_BYTES``.
+    """
+    global _active
+    if keys is None:
+        keys = os.environ.get(SESSION_KEY_ENV)
+        if not keys:
+            raise ValueError("No session key given and {} is not set".format(SESSION_KEY_ENV))
+    _active = SignedSessions(keys, ttl)
+    return _active
@@ -0,0 +1,751 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.static
+~~~~~~~~~~~~~~~~~
+
+This module provides the static file layer shared by :class:`HttpAdapter
+<HttpAdapter>` and :class:`Response <Response>`.
+
+Files larger than ``SENDFILE_THRESHOLD`` are never read into the Python heap:
+they are described by a :class:`FileSegment <FileSegment>` and sent with
+``socket.sendfile`` / ``os.sendfile`` straight from the page cache. Smaller
+files are read once into the cache.
+
+A response is therefore either complete ``bytes`` or a ``(header, part,
+...)`` tuple whose parts are ``bytes`` or :class:`FileSegment <FileSegment>`
+objects, written in order; :func:`is_file_response` tells them apart.
+:func:`join_response` keeps bodies of ``SCATTER_THRESHOLD`` bytes or more
+apart from their header instead of copying both into a new buffer; the
+``bytes`` parts are then written together with one ``socket.sendmsg``
+(``writev``) by :func:`send_buffers`, which resumes partial writes from a
+``memoryview`` offset.
+
+:data:`ASSET_CACHE` keeps recently served files in memory with their
+serialized response header, bounded by a byte budget with LRU eviction. It
+is keyed by the real path :func:`resolve_path` returns, which refuses any
+request path leading outside of the served directory. An
+entry is revalidated with one ``os.stat`` at most every
+``REVALIDATE_INTERVAL`` seconds, so a hot asset normally costs no syscall
+besides the send, and an edited file is picked up within that interval.
+
+Every asset carries a strong ``ETag`` and a ``Last-Modified`` date;
+:func:`is_not_modified` evaluates ``If-None-Match`` / ``If-Modified-Since``
+so the adapter can answer a bodyless 304 from the cached header.
+
+``Range`` requests (RFC 7233) are answered with 206 Partial Content, as a
+single part or as ``multipart/byteranges``. Ranges of a large file are new
+:class:`FileSegment <FileSegment>` offsets into it, so seeking through media
+never loads the file into the heap; ``If-Range`` falls back to the full body
+when the client's copy is stale.
+
+Text assets held in memory also get gzip and deflate variants, compressed
+once when the asset is loaded and cached with it. :func:`select_variant`
+negotiates ``Accept-Encoding``; each variant has its own strong ETag, and
+every response of a compressible asset carries ``Vary: Accept-Encoding``.
+Images are already compressed and are always sent as they are.
+
+Usage Example:
+--------------
+>>> body, st = load_body("static/images/welcome.png")
+>>> if isinstance(body, FileSegment):
+>>>     conn.sendall(header)
+>>>     body.sendfile(conn)
+
+>>> asset = ASSET_CACHE.get(resolve_path("www", "index.html"))
+>>> conn.sendall(asset.header + b"Connection: close\r\n\r\n" + asset.body)
+"""
+
+import collections
+import email.utils
+import gzip
+import hashlib
+import os
+import secrets
+import socket
+import stat
+import threading
+import time
+import zlib
+
+#: Files at least this large are sent with sendfile instead of being read.
+SENDFILE_THRESHOLD = 64 * 1024
+#: Bodies at least this large are written next to their header with sendmsg
+#: rather than concatenated to it.
+SCATTER_THRESHOLD = 4096
+#: Scatter writes use sendmsg where the platform has it.
+HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+try:
+    IOV_MAX = min(os.sysconf("SC_IOV_MAX"), 1024)
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 16
+#: Byte budget of the asset cache (bodies plus headers).
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+#: Seconds a cached asset is trusted before it is checked with os.stat again.
+REVALIDATE_INTERVAL = 1.0
+
+#: Ranges accepted in one request; more are ignored and the full body is sent.
+MAX_RANGES = 16
+
+#: Bodies smaller than this are not worth compressing.
+MIN_COMPRESS_SIZE = 256
+#: Content types that get gzip/deflate variants.
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json",
+                      "image/svg+xml")
+#: Supported content codings, in order of preference.
+ENCODINGS = {
+    "gzip": lambda data: gzip.compress(data, 9, mtime=0),
+    "deflate": lambda data: zlib.compress(data, 9),
+}
+
+#: Content types by file extension.
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css",
+    ".js": "application/javascript",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+}
+
+
+class FileSegment:
+    """A byte range of a file on disk, sent without copying it through
+    Python.
+
+    :attrs path (str): file location.
+    :attrs offset (int): first byte to send.
+    :attrs count (int): number of bytes to send.
+    """
+
+    __slots__ = ("path", "offset", "count")
+
+    def __init__(self, path, offset, count):
+        self.path = path
+        self.offset = offset
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return "<FileSegment {} [{}:+{}]>".format(self.path, self.offset, self.count)
+
+    def sendfile(self, sock):
+        """
+        Sends the segment on a blocking socket (timeouts allowed).
+
+        :param sock (socket.socket): client connection.
+
+        :raises OSError: if the file ended before ``count`` bytes were sent;
+                         the announced Content-Length can no longer be met.
+        """
+        with open(self.path, "rb") as f:
+            sent = sock.sendfile(f, self.offset, self.count)
+        if sent < self.count:
+            raise OSError("{} shrank while being sent".format(self.path))
+
+
+def load_body(path):
+    """
+    Returns the body of a static file with the status it was read under:
+    its bytes when smaller than ``SENDFILE_THRESHOLD``, otherwise a
+    :class:`FileSegment <FileSegment>` covering the whole file.
+
+    The status comes from ``os.fstat`` on the descriptor the body is read
+    from, so a file replaced after an earlier ``os.stat`` cannot pair its
+    new contents with old validators.
+
+    :param path (str): file location.
+
+    :rtype tuple: ``(body, os.stat_result)``.
+    """
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_size < SENDFILE_THRESHOLD:
+            return f.read(), st
+    return FileSegment(path, 0, st.st_size), st
+
+
+def http_date(timestamp):
+    """Formats a POSIX timestamp as an HTTP date (RFC 7231 IMF-fixdate)."""
+    return email.utils.formatdate(timestamp, usegmt=True)
+
+
+def is_not_modified(asset, headers):
+    """
+    Evaluates the conditional headers of a GET against ``asset``.
+
+    ``If-None-Match`` takes precedence over ``If-Modified-Since`` (RFC 7232
+    section 6); tags are compared weakly as that header requires.
+
+    :param asset (StaticAsset): the asset that would be served.
+    :param headers (CaseInsensitiveDict): request headers.
+
+    :rtype bool: ``True`` if a 304 Not Modified should be sent instead.
+    """
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag == asset.etag:
+                return True
+        return False
+
+    if_modified_since = headers.get("If-Modified-Since")
+    if if_modified_since:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since is None or since.tzinfo is None:
+            return False
+        return asset.mtime_ns // 1_000_000_000 <= int(since.timestamp())
+    return False
+
+
+class RangeNotSatisfiable(ValueError):
+    """No range of a ``Range`` header overlaps the file; answered with 416."""
+
+
+def parse_range(value, size):
+    """
+    Parses a ``Range`` header against a body of ``size`` bytes.
+
+    Overlapping and adjacent ranges are merged, as RFC 7233 allows.
+
+    :param value (str): header value, e.g. ``bytes=0-99,-500``.
+    :param size (int): body length.
+
+    :rtype list: sorted ``(start, end)`` pairs, ``end`` inclusive, or
+                 ``None`` when the header is invalid or has too many ranges
+                 and must be ignored.
+    :raises RangeNotSatisfiable: the header is valid but no range overlaps.
+    """
+    unit, _, specs = value.partition("=")
+    if unit.strip().lower() != "bytes" or not specs:
+        return None
+    specs = specs.split(",")
+    if len(specs) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for spec in specs:
+        first, dash, last = spec.strip().partition("-")
+        if not dash:
+            return None
+        try:
+            if first:
+                start = int(first)
+                end = int(last) if last else max(start, size - 1)
+                if start < 0 or end < start:
+                    return None
+            else:
+                suffix = int(last)
+                if suffix < 0:
+                    return None
+                if suffix == 0:
+                    continue
+                start, end = max(size - suffix, 0), size - 1
+        except ValueError:
+            return None
+        if start < size:
+            ranges.append((start, min(end, size - 1)))
+
+    if not ranges:
+        raise RangeNotSatisfiable("Range {} outside of {} bytes".format(value, size))
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        if start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def select_ranges(asset, headers):
+    """
+    Evaluates ``Range`` and ``If-Range`` of a GET against ``asset``.
+
+    :param asset (StaticAsset): the asset that would be served.
+    :param headers (CaseInsensitiveDict): request headers.
+
+    :rtype list: ``(start, end)`` pairs to send as 206, or ``None`` to send
+                 the full body.
+    :raises RangeNotSatisfiable: see :func:`parse_range`.
+    """
+    value = headers.get("Range")
+    if not value or asset.size == 0:
+        return None
+    if_range = headers.get("If-Range")
+    if if_range is not None:
+        # Strong comparison only: a weak tag or another date means the client
+        # holds a different version, which gets the whole new body.
+        if_range = if_range.strip()
+        if if_range != asset.etag and if_range != asset.last_modified:
+            return None
+    return parse_range(value, asset.size)
+
+
+def partial_response(asset, ranges, tail=b"\r\n"):
+    """
+    Builds the 206 Partial Content response for ``ranges`` of ``asset``.
+
+    :param asset (StaticAsset): the asset being served.
+    :param ranges (list): ``(start, end)`` pairs from :func:`select_ranges`.
+    :param tail (bytes): remaining header lines plus the blank line, e.g.
+                         the Connection header of the adapter.
+
+    :rtype bytes | tuple: the response, see :func:`is_file_response`.
+    """
+    validators = f"ETag: {asset.etag}\r\nLast-Modified: {asset.last_modified}\r\n"
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        header = (
+            "HTTP/1.1 206 Partial Content\r\n"
+            f"Content-Type: {asset.content_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{asset.size}\r\n"
+            f"Content-Length: {end - start + 1}\r\n"
+            "Accept-Ranges: bytes\r\n"
+            + validators + asset.vary
+        ).encode("utf-8") + tail
+        return join_response(header, asset.slice(start, end))
+
+    boundary = secrets.token_hex(16)
+    parts = []
+    for start, end in ranges:
+        parts.append((
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {asset.content_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{asset.size}\r\n\r\n"
+        ).encode("utf-8"))
+        parts.append(asset.slice(start, end))
+    parts.append(f"\r\n--{boundary}--\r\n".encode("utf-8"))
+    header = (
+        "HTTP/1.1 206 Partial Content\r\n"
+        f"Content-Type: multipart/byteranges; boundary={boundary}\r\n"
+        f"Content-Length: {sum(len(part) for part in parts)}\r\n"
+        "Accept-Ranges: bytes\r\n"
+        + validators + asset.vary
+    ).encode("utf-8") + tail
+    return join_response(header, *parts)
+
+
+def range_not_satisfiable(asset, tail=b"\r\n"):
+    """Builds the 416 response for a ``Range`` outside of ``asset``."""
+    return (
+        "HTTP/1.1 416 Range Not Satisfiable\r\n"
+        f"Content-Range: bytes */{asset.size}\r\n"
+        "Content-Length: 0\r\n"
+    ).encode("utf-8") + tail
+
+
+def guess_content_type(path):
+    """Returns the Content-Type served for ``path``, from its extension."""
+    ext = os.path.splitext(path)[1].lower()
+    return CONTENT_TYPES.get(ext, "application/octet-stream")
+
+
+def resolve_path(root, rel_path):
+    """
+    Resolves ``rel_path`` under the directory ``root``, following ``..``
+    segments and symbolic links, so the result is a canonical cache key.
+
+    :param root (str): served directory, e.g. ``www`` or ``static``.
+    :param rel_path (str): path of the request below ``root``.
+
+    :rtype str: the real path, or ``None`` if it lies outside of ``root``.
+    """
+    base = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(base, rel_path.lstrip("/")))
+    if path != base and not path.startswith(base + os.sep):
+        return None
+    return path
+
+
+class StaticAsset:
+    """A static file as served: its body and the serialized start of its
+    response header.
+
+    :attrs path (str): file location, the cache key.
+    :attrs size (int): body length in bytes.
+    :attrs content_type (str): Content-Type header value.
+    :attrs body (bytes | FileSegment): file contents, or a segment for large
+                                       files.
+    :attrs etag (str): strong entity tag, quoted.
+    :attrs last_modified (str): file mtime as an HTTP date.
+    :attrs header (bytes): status line, Content-Type, Content-Length, ETag and
+                           Last-Modified, without the Connection lines and
+                           blank line.
+    :attrs not_modified_header (bytes): the same for the 304 response.
+    :attrs vary (str): ``Vary`` header line of compressible assets, else "".
+    :attrs variants (dict): content coding -> :class:`EncodedVariant
+                            <EncodedVariant>`.
+    """
+
+    __slots__ = ("path", "size", "mtime_ns", "ino", "content_type", "body",
+                 "etag", "last_modified", "vary", "header",
+                 "not_modified_header", "variants", "checked")
+
+    #: identity representation, see :attr:`EncodedVariant.encoding`
+    encoding = None
+
+    def __init__(self, path):
+        self.path = path
+        self.body, st = load_body(path)
+        # The length of the bytes read, should the file have changed since
+        # it was stat'ed
+        self.size = len(self.body)
+        self.mtime_ns = st.st_mtime_ns
+        self.ino = st.st_ino
+        self.content_type = guess_content_type(path)
+        if isinstance(self.body, FileSegment):
+            # Hashing a large file would read it; its identity is enough
+            self.etag = '"{:x}-{:x}-{:x}"'.format(self.ino, self.size, self.mtime_ns)
+        else:
+            self.etag = '"{}"'.format(hashlib.sha1(self.body).hexdigest()[:20])
+        self.last_modified = http_date(st.st_mtime)
+        compressible = (not isinstance(self.body, FileSegment)
+                        and self.size >= MIN_COMPRESS_SIZE
+                        and self.content_type.startswith(COMPRESSIBLE_TYPES))
+        self.vary = "Vary: Accept-Encoding\r\n" if compressible else ""
+        validators = (
+            f"ETag: {self.etag}\r\n"
+            f"Last-Modified: {self.last_modified}\r\n"
+            + self.vary
+        )
+        self.header = (
+            "HTTP/1.1 200 OK\r\n"
+            f"Content-Type: {self.content_type}\r\n"
+            f"Content-Length: {self.size}\r\n"
+            "Accept-Ranges: bytes\r\n"
+            + validators
+        ).encode("utf-8")
+        self.not_modified_header = ("HTTP/1.1 304 Not Modified\r\n" + validators).encode("utf-8")
+        self.variants = {}
+        if compressible:
+            for encoding, compress in ENCODINGS.items():
+                data = compress(self.body)
+                if len(data) < self.size:
+                    self.variants[encoding] = EncodedVariant(self, encoding, data)
+        #: monotonic time of the last os.stat check
+        self.checked = time.monotonic()
+
+    def slice(self, start, end):
+        """Returns bytes ``start`` to ``end`` (inclusive) of the body, as bytes
+        or as a :class:`FileSegment <FileSegment>`."""
+        if isinstance(self.body, FileSegment):
+            return FileSegment(self.path, start, end - start + 1)
+        return self.body[start:end + 1]
+
+    @property
+    def cost(self):
+        """Bytes of memory charged to the cache for this asset."""
+        body = 0 if isinstance(self.body, FileSegment) else len(self.body)
+        variants = sum(len(v.body) + len(v.header) for v in self.variants.values())
+        return body + len(self.header) + variants
+
+    def matches(self, st):
+        """``True`` if ``st`` describes the file this asset was loaded from."""
+        return (st.st_mtime_ns == self.mtime_ns and st.st_size == self.size
+                and st.st_ino == self.ino)
+
+
+class EncodedVariant:
+    """A compressed representation of a :class:`StaticAsset <StaticAsset>`.
+
+    It has the attributes of its asset that the response helpers read, with
+    its own body, length, ETag and headers.
+
+    :attrs encoding (str): content coding, e.g. ``gzip``.
+    """
+
+    __slots__ = ("path", "size", "mtime_ns", "content_type", "body", "etag",
+                 "last_modified", "vary", "encoding", "header",
+                 "not_modified_header")
+
+    def __init__(self, asset, encoding, data):
+        self.path = asset.path
+        self.size = len(data)
+        self.mtime_ns = asset.mtime_ns
+        self.content_type = asset.content_type
+        self.body = data
+        self.etag = asset.etag[:-1] + "-" + encoding + '"'
+        self.last_modified = asset.last_modified
+        self.vary = asset.vary
+        self.encoding = encoding
+        validators = (
+            f"ETag: {self.etag}\r\n"
+            f"Last-Modified: {self.last_modified}\r\n"
+            + self.vary
+        )
+        self.header = (
+            "HTTP/1.1 200 OK\r\n"
+            f"Content-Type: {self.content_type}\r\n"
+            f"Content-Encoding: {encoding}\r\n"
+            f"Content-Length: {self.size}\r\n"
+            + validators
+        ).encode("utf-8")
+        self.not_modified_header = ("HTTP/1.1 304 Not Modified\r\n" + validators).encode("utf-8")
+
+
+def negotiate_encoding(value, available):
+    """
+    Picks a content coding from an ``Accept-Encoding`` header.
+
+    :param value (str): header value, e.g. ``gzip, deflate;q=0.5``.
+    :param available (iterable): codings the asset has, in order of preference.
+
+    :rtype str: the coding with the highest q-value, or ``None`` for identity.
+    """
+    if not value:
+        return None
+    weights = {}
+    for item in value.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def select_variant(asset, headers):
+    """
+    Returns the representation of ``asset`` to send for a request: an
+    :class:`EncodedVariant <EncodedVariant>` the client accepts, or the asset
+    itself. Range requests always get the identity representation.
+
+    :param asset (StaticAsset): the asset being served.
+    :param headers (CaseInsensitiveDict): request headers.
+    """
+    if not asset.variants or headers.get("Range"):
+        return asset
+    encoding = negotiate_encoding(headers.get("Accept-Encoding"), asset.variants)
+    if encoding is None:
+        return asset
+    return asset.variants[encoding]
+
+
+class StaticCache:
+    """The :class:`StaticCache <StaticCache>` object maps file paths to
+    :class:`StaticAsset <StaticAsset>` entries, least recently used first.
+
+    It is shared by every connection and engine thread, so lookups and
+    evictions hold a lock; files are read outside of it.
+
+    :attrs max_bytes (int): byte budget, see :attr:`StaticAsset.cost`.
+    :attrs revalidate_interval (float): seconds between os.stat checks.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES,
+                 revalidate_interval=REVALIDATE_INTERVAL):
+        self.max_bytes = max_bytes
+        self.revalidate_interval = revalidate_interval
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """
+        Returns the asset for ``path``, loading or reloading it as needed.
+
+        :param path (str): file location.
+
+        :rtype StaticAsset: the asset, or ``None`` if ``path`` is not a
+                            regular file.
+        :raises OSError: the file exists but cannot be read.
+        """
+        now = time.monotonic()
+        with self._lock:
+            asset = self._entries.get(path)
+            if asset is not None:
+                self._entries.move_to_end(path)
+                if now - asset.checked < self.revalidate_interval:
+                    self.hits += 1
+                    return asset
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
+            self.invalidate(path)
+            return None
+        if asset is not None and asset.matches(st):
+            asset.checked = now
+            with self._lock:
+                self.hits += 1
+            return asset
+
+        asset = StaticAsset(path)
+        with self._lock:
+            self.misses += 1
+            self._store(path, asset)
+        return asset
+
+    def invalidate(self, path=None):
+        """Drops ``path`` from the cache, or every entry when ``path`` is None."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self.size = 0
+                return
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self.size -= old.cost
+
+    def stats(self):
+        """Returns a snapshot of the cache counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _store(self, path, asset):
+        old = self._entries.pop(path, None)
+        if old is not None:
+            self.size -= old.cost
+        if asset.cost > self.max_bytes:
+            return
+        self._entries[path] = asset
+        self.size += asset.cost
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.cost
+
+
+#: Asset cache shared by the adapter and :class:`Response <Response>`.
+ASSET_CACHE = StaticCache()
+
+
+def is_file_response(response):
+    """``True`` if ``response`` is a ``(header, part, ...)`` tuple."""
+    return isinstance(response, tuple)
+
+
+def join_response(header, *parts):
+    """
+    Assembles a response from its header and body parts.
+
+    :rtype bytes | tuple: ``header + body`` when the body is small and in
+                          memory, else ``(header, part, ...)`` so the body
+                          is written without being copied.
+    """
+    if len(parts) == 1 and not isinstance(parts[0], FileSegment):
+        if len(parts[0]) < SCATTER_THRESHOLD:
+            return header + parts[0]
+    elif not any(isinstance(part, FileSegment) for part in parts) and \
+            sum(len(part) for part in parts) < SCATTER_THRESHOLD:
+        return header + b"".join(parts)
+    return (header, *parts)
+
+
+def queue_parts(buffers, response):
+    """Appends the parts of ``response`` to the deque ``buffers``: ``bytes``
+    as memoryviews for :func:`send_buffers`, :class:`FileSegment
+    <FileSegment>` parts as they are; empty parts are dropped."""
+    for part in response if is_file_response(response) else (response,):
+        if isinstance(part, FileSegment):
+            buffers.append(part)
+        elif part:
+            buffers.append(memoryview(part))
+
+
+def send_buffers(sock, buffers):
+    """
+    Writes the leading memoryviews of the deque ``buffers``, up to the first
+    :class:`FileSegment <FileSegment>`, with one ``sendmsg`` call, and drops
+    what went out; a partially written buffer is replaced by the rest of it.
+
+    :rtype bool: ``True`` if every buffer of the batch was written.
+    :raises BlockingIOError: a non-blocking socket is full.
+    """
+    batch = []
+    for buffer in buffers:
+        if isinstance(buffer, FileSegment) or len(batch) == IOV_MAX:
+            break
+        batch.append(buffer)
+    if HAS_SENDMSG:
+        sent = sock.sendmsg(batch)
+    else:
+        sent = sock.send(batch[0])
+        batch = batch[:1]
+    complete = sent == sum(len(buffer) for buffer in batch)
+    while sent:
+        head = buffers[0]
+        if sent >= len(head):
+            buffers.popleft()
+            sent -= len(head)
+        else:
+            buffers[0] = head[sent:]
+            sent = 0
+    return complete
+
+
+def response_status(response):
+    """Returns the status code of a response built by the adapter."""
+    head = response[0] if is_file_response(response) else response
+    try:
+        return int(head[9:12])
+    except ValueError:
+        return 0
+
+
+def response_length(response):
+    """Returns the number of bytes a response puts on the wire."""
+    if is_file_response(response):
+        return sum(len(part) for part in response)
+    return len(response)
+
+
+def send_response(sock, response):
+    """
+    Writes a complete response on a blocking socket.
+
+    :param sock (socket.socket): client connection.
+    :param response (bytes | tuple): bytes, or ``(header, part, ...)`` with
+                                     ``bytes`` and ``FileSegment`` parts.
+    """
+    if not is_file_response(response):
+        sock.sendall(response)
+        return
+    buffers = collections.deque()
+    queue_parts(buffers, response)
+    while buffers:
+        if isinstance(buffers[0], FileSegment):
+            buffers.popleft().sendfile(sock)
+        else:
+            send_buffers(sock, buffers)
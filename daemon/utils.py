@@ -10,6 +10,7 @@
 # while attending the course
 #
 
+import socket
 from urllib.parse import urlparse, parse_qs, unquote
 
 def get_auth_from_url(url):
@@ -24,4 +25,27 @@ def get_auth_from_url(url):
         pwd  = unquote(parsed.password) if parsed.password else ""
     except (AttributeError, TypeError):
         user, pwd = "", ""
-    return {"username": user, "password": pwd}
\ No newline at end of file
+    return {"username": user, "password": pwd}
+
+def create_listen_socket(ip, port, backlog=50, reuse_port=False):
+    """Create a TCP socket bound to (ip, port) and listening.
+
+    With ``reuse_port`` the socket sets ``SO_REUSEPORT`` so several worker
+    processes can bind the same port and let the kernel spread incoming
+    connections across them.
+
+    :rtype: socket.socket
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            if not hasattr(socket, "SO_REUSEPORT"):
+                raise OSError("SO_REUSEPORT is not supported on this platform")
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((ip, port))
+        sock.listen(backlog)
+    except OSError:
+        sock.close()
+        raise
+    return sock
@@ -18,6 +18,7 @@ This module provides a WeApRous object to deploy RESTful url web app with routin
 """
 
 from .backend import create_backend
+from .router import Router
 
 class WeApRous:
     """The fully mutable :class:`WeApRous <WeApRous>` object, which is a lightweight,
@@ -40,16 +41,43 @@ class WeApRous:
       >>> def hello(headers, body):
       >>>     return {'message': 'Hello, world!'}
 
+      >>> @app.route('/peer/<int:id>', methods=['GET', 'DELETE'])
+      >>> def peer(headers, body, id):
+      >>>     return {'peer': id}
+
+      >>> @app.route('/peers', methods=['GET'])
+      >>> def peers(headers, body):
+      >>>     return RawJSON.dumps(peer_list)      # or bytes, str, Reply(...)
+
+      >>> @app.route('/peer/<int:id>', methods=['DELETE'])
+      >>> def drop(headers, body, id):
+      >>>     return Reply({'error': 'unknown peer'}, status=404)
+
+      >>> @app.route('/wait', methods=['GET'])
+      >>> async def wait(headers, body):
+      >>>     await asyncio.sleep(1)
+      >>>     return {'message': 'Awaited on the event loop'}
+
       >>> app.run()
+      >>> app.run(pool_size=16, overflow='reject')
+      >>> app.run(engine='asyncio')
+      >>> app.run(processes=4)
+      >>> app.run(metrics=True)         # GET /metrics, Prometheus format
+      >>> app.run(profiling=True)       # POST /debug/profiles?next=5
+      >>> app.run(sampling=True)        # GET /debug/stacks, kill -USR2 dumps
+      >>> app.run(memory=True)          # GET /debug/memory/top, tracemalloc
     """
 
-    def __init__(self):
+    def __init__(self, sniff_strings=False):
         """
         Initialize a new WeApRous instance.
 
         Sets up an empty route registry and prepares placeholders for IP and port.
+
+        :param sniff_strings (bool): default of ``sniff`` in :meth:`route`.
         """
-        self.routes = {}
+        self.routes = Router()
+        self.sniff_strings = sniff_strings
         self.ip = None
         self.port = None
         return
@@ -64,12 +92,20 @@ class WeApRous:
         self.ip = ip
         self.port = port
 
-    def route(self, path, methods=['GET']):
+    def route(self, path, methods=['GET'], sniff=None):
         """
         Decorator to register a route handler for a specific path and HTTP methods.
 
-        :param path (str): The URL path to route.
-        :param methods (list): A list of HTTP methods (e.g., ['GET', 'POST']) to bind.
+        :param path (str): The URL path to route; ``<name>``, ``<int:name>``,
+                           ``<float:name>`` and ``<path:name>`` segments are
+                           captured and passed to the handler as keyword
+                           arguments (see :mod:`daemon.router`).
+        :param methods (list): A list of HTTP methods (e.g., ['GET', 'POST']) to bind,
+                               ``'*'`` for any method.
+        :param sniff (bool): serve ``str`` results starting with ``{``/``[`` as
+                             JSON and ``<`` as HTML instead of plain text;
+                             ``sniff_strings`` of the app if ``None``. See
+                             :mod:`daemon.reply` for the other result types.
 
         :rtype: function - A decorator that registers the handler function.
         """
@@ -80,22 +116,28 @@ class WeApRous:
             # Optional attach route metadata to the function
             func._route_path = path
             func._route_methods = methods
+            func._route_sniff = self.sniff_strings if sniff is None else sniff
 
             return func
         return decorator
 
-    def run(self):
+    def run(self, **options):
         """
         Start the backend server and begin handling requests.
 
         This method launches the TCP server using the configured IP and port,
         and dispatches incoming requests to the registered route handlers.
 
+        :param options: backend settings forwarded to :func:`create_backend`,
+                        e.g. ``pool_size``, ``queue_size``, ``overflow``,
+                        ``engine``, ``processes``, ``log_level``, ``metrics``, ``profiling``, ``sampling``, ``memory`` and ``session_key``. Handlers declared with ``async def`` are
+                        awaited on the event loop of the ``asyncio`` engine.
+
         :raise: Error if IP or port has not been configured.
         """
         if not self.ip or not self.port:
             print("Rous app need to preapre address"
                   "by calling app.prepare_address(ip,port)")
 
-        create_backend(self.ip, self.port, self.routes)
+        create_backend(self.ip, self.port, self.routes, **options)
         
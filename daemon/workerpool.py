@@ -0,0 +1,204 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.workerpool
+~~~~~~~~~~~~~~~~~
+
+This module provides a fixed-size pool of worker threads fed by a bounded
+queue. The backend hands every accepted connection to the pool instead of
+spawning one thread per client, so a connection burst is absorbed by the
+queue rather than by thousands of new threads.
+
+When the queue is full the pool applies an overflow policy:
+
+- ``block``: the caller (the accept loop) waits until a slot frees up, which
+  pushes the backpressure down to the kernel listen backlog.
+- ``reject``: the job is refused immediately so the caller can answer
+  ``503 Service Unavailable``.
+
+Usage Example:
+--------------
+>>> pool = WorkerPool(workers=8, queue_size=64, overflow="reject")
+>>> pool.start()
+>>> if not pool.submit(handle_client, conn, addr):
+>>>     conn.close()
+>>> pool.stats()
+{'workers': 8, 'busy': 1, 'queue_depth': 0, ...}
+"""
+
+import queue
+import threading
+import time
+
+from .logger import get_logger
+from .metrics import METRICS
+
+log = get_logger("WorkerPool")
+
+#: Default number of worker threads serving connections.
+DEFAULT_POOL_SIZE = 64
+#: Default number of accepted connections allowed to wait for a worker.
+DEFAULT_QUEUE_SIZE = 256
+#: Supported behaviours when the queue is full.
+OVERFLOW_POLICIES = ("block", "reject")
+
+_STOP = object()
+
+
+class WorkerPool:
+    """The :class:`WorkerPool <WorkerPool>` object runs submitted jobs on a
+    fixed number of daemon threads and keeps counters describing its load.
+
+    :attrs workers (int): number of worker threads.
+    :attrs queue_size (int): capacity of the pending job queue.
+    :attrs overflow (str): policy applied when the queue is full.
+    """
+
+    def __init__(self, workers=DEFAULT_POOL_SIZE, queue_size=DEFAULT_QUEUE_SIZE,
+                 overflow="block", name="worker"):
+        if workers < 1:
+            raise ValueError("WorkerPool needs at least one worker")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError("Invalid overflow policy {}".format(overflow))
+
+        self.workers = workers
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.name = name
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+
+        self._busy = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_last = 0.0
+
+    def start(self):
+        """Spawns the worker threads. Calling it twice has no effect."""
+        if self._threads:
+            return self
+        METRICS.register_pool(self)
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker,
+                                      name="{}-{}".format(self.name, index))
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, func, *args):
+        """
+        Queues ``func(*args)`` for execution on a worker thread.
+
+        :param func (callable): job to run.
+        :param args: positional arguments for the job.
+
+        :rtype bool: ``True`` if the job was queued, ``False`` if it was
+                     rejected because the queue is full.
+        """
+        item = (time.monotonic(), func, args)
+        if self.overflow == "reject":
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                with self._lock:
+                    self._rejected += 1
+                return False
+        else:
+            self._queue.put(item)
+
+        with self._lock:
+            self._submitted += 1
+        return True
+
+    def full(self):
+        """Returns ``True`` if the next :meth:`submit` would block or be rejected."""
+        return self._queue.full()
+
+    def shutdown(self, wait=True):
+        """
+        Stops the workers once the jobs already queued have run.
+
+        :param wait (bool): join the worker threads before returning.
+        """
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def stats(self):
+        """
+        Snapshot of the pool load.
+
+        :rtype dict: worker count, busy workers, current queue depth, job
+                     counters and queue wait times in milliseconds.
+        """
+        with self._lock:
+            started = self._completed + self._failed + self._busy
+            return {
+                "workers": self.workers,
+                "busy": self._busy,
+                "queue_depth": self._queue.qsize(),
+                "queue_size": self.queue_size,
+                "overflow": self.overflow,
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "failed": self._failed,
+                "wait_avg_ms": (self._wait_total / started * 1000.0) if started else 0.0,
+                "wait_max_ms": self._wait_max * 1000.0,
+                "wait_last_ms": self._wait_last * 1000.0,
+            }
+
+    def report(self):
+        """Returns :meth:`stats` as a single human readable line."""
+        s = self.stats()
+        return ("workers={workers} busy={busy} queue={queue_depth}/{queue_size} "
+                "rejected={rejected} wait_avg={wait_avg_ms:.1f}ms "
+                "wait_max={wait_max_ms:.1f}ms".format(**s))
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            enqueued, func, args = item
+            waited = time.monotonic() - enqueued
+            with self._lock:
+                self._busy += 1
+                self._wait_total += waited
+                self._wait_last = waited
+                if waited > self._wait_max:
+                    self._wait_max = waited
+            METRICS.queue_waited(self.name, waited)
+            ok = True
+            try:
+                func(*args)
+            except Exception as e:
+                ok = False
+                log.error("job error: %s", e)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+                    if ok:
+                        self._completed += 1
+                    else:
+                        self._failed += 1
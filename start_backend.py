@@ -26,6 +26,7 @@ import socket
 import argparse
 
 from daemon import create_backend
+from daemon.session import load_session_key
 
 # Default port number used if none is specified via command-line arguments.
 PORT = 9000 
@@ -40,6 +41,7 @@ if __name__ == "__main__":
 
     :arg --server-ip (str): IP address to bind the server (default: 127.0.0.1).
     :arg --server-port (int): Port number to bind the server (default: 9000).
+    :arg --workers (int): Number of prefork worker processes (default: 1).
     """
 
     parser = argparse.ArgumentParser(
@@ -58,9 +60,34 @@ if __name__ == "__main__":
         default=PORT,
         help='Port number to bind the server. Default is {}.'.format(PORT)
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of worker processes sharing the port via SO_REUSEPORT. Default is 1.'
+    )
+    parser.add_argument(
+        '--log-level',
+        choices=['debug', 'info', 'warning', 'error'],
+        default=None,
+        help='Log level. Default is $WEAPROUS_LOG_LEVEL or info.'
+    )
+    parser.add_argument(
+        '--sample-hz',
+        type=int,
+        default=0,
+        help='Sample thread stacks at this rate (GET /debug/stacks, kill -USR2 dumps). Default is off.'
+    )
+    parser.add_argument(
+        '--session-key-file',
+        default=None,
+        help='File holding the HMAC key of stateless session cookies. Default is $WEAPROUS_SESSION_KEY.'
+    )
  
     args = parser.parse_args()
     ip = args.server_ip
     port = args.server_port
 
-    create_backend(ip, port)
+    session_key = load_session_key(args.session_key_file) if args.session_key_file else None
+    create_backend(ip, port, processes=args.workers, log_level=args.log_level,
+                   sampling=args.sample_hz, session_key=session_key)
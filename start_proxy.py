@@ -116,6 +116,10 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(prog='Proxy', description='', epilog='Proxy daemon')
     parser.add_argument('--server-ip', default='0.0.0.0')
     parser.add_argument('--server-port', type=int, default=PROXY_PORT)
+    parser.add_argument('--sample-hz', type=int, default=0,
+                        help='Sample thread stacks at this rate in Hz; kill -USR2 dumps them')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Serve connection, byte and per-backend request counters on /metrics')
  
     args = parser.parse_args()
     ip = args.server_ip
@@ -123,4 +127,4 @@ if __name__ == "__main__":
 
     routes = parse_virtual_hosts("config/proxy.conf")
 
-    create_proxy(ip, port, routes)
+    create_proxy(ip, port, routes, sampling=args.sample_hz, metrics=args.metrics)
@@ -29,6 +29,7 @@ import socket
 import argparse
 
 from daemon.weaprous import WeApRous
+from daemon.session import load_session_key
 
 PORT = 8000  # Default port
 
@@ -65,6 +66,14 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(prog='Backend', description='', epilog='Beckend daemon')
     parser.add_argument('--server-ip', default='0.0.0.0')
     parser.add_argument('--server-port', type=int, default=PORT)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes sharing the port via SO_REUSEPORT')
+    parser.add_argument('--log-level', choices=['debug', 'info', 'warning', 'error'],
+                        help='Log level, default $WEAPROUS_LOG_LEVEL or info')
+    parser.add_argument('--sample-hz', type=int, default=0,
+                        help='Sample thread stacks at this rate in Hz; kill -USR2 dumps them')
+    parser.add_argument('--session-key-file',
+                        help='File holding the HMAC key of stateless session cookies (default $WEAPROUS_SESSION_KEY)')
  
     args = parser.parse_args()
     ip = args.server_ip
@@ -72,4 +81,6 @@ if __name__ == "__main__":
 
     # Prepare and launch the RESTful application
     app.prepare_address(ip, port)
-    app.run()
\ No newline at end of file
+    session_key = load_session_key(args.session_key_file) if args.session_key_file else None
+    app.run(processes=args.workers, log_level=args.log_level, sampling=args.sample_hz,
+            session_key=session_key)
\ No newline at end of file